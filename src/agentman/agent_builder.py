@@ -1,14 +1,16 @@
 """Agent builder module for generating files from Agentfile configuration."""
 
 import json
+import shutil
 import subprocess
 from pathlib import Path
 
-import yaml
-
 from agentman.agentfile_parser import AgentfileConfig, AgentfileParser
 from agentman.frameworks import AgnoFramework, FastAgentFramework
 
+# Dockerfile instructions that the builder places itself instead of copying in order
+_PLACED_INSTRUCTIONS = frozenset(("FROM", "EXPOSE", "CMD"))
+
 
 class AgentBuilder:
     """Builds agent files from Agentfile configuration."""
@@ -61,8 +63,6 @@ class AgentBuilder:
     def _copy_prompt_file(self):
         """Copy prompt.txt to output directory if it exists."""
         if self.has_prompt_file:
-            import shutil
-
             dest_path = self.output_dir / "prompt.txt"
             shutil.copy2(self.prompt_file_path, dest_path)
 
@@ -95,21 +95,20 @@ class AgentBuilder:
             ]
         )
 
-        # Add all other Dockerfile instructions in order (except FROM)
-        # We'll handle EXPOSE and CMD at the end in their proper positions
-        for instruction in self.config.dockerfile_instructions:
-            if instruction.instruction not in ["FROM", "EXPOSE", "CMD"]:
-                lines.append(instruction.to_dockerfile_line())
+        # Split the instructions in one pass: all others are added in order
+        # (except FROM), while EXPOSE and CMD are placed at the end
+        custom_instructions = []
+        placed_instructions = {name: [] for name in _PLACED_INSTRUCTIONS}
+        for inst in self.config.dockerfile_instructions:
+            placed_instructions.get(inst.instruction, custom_instructions).append(inst)
+        lines.extend(inst.to_dockerfile_line() for inst in custom_instructions)
 
         # Add a blank line if we have custom instructions
-        custom_instructions = [
-            inst for inst in self.config.dockerfile_instructions if inst.instruction not in ["FROM", "EXPOSE", "CMD"]
-        ]
         if custom_instructions:
             lines.append("")
 
         # Set working directory if not already set by custom instructions
-        workdir_set = any(inst.instruction == "WORKDIR" for inst in self.config.dockerfile_instructions)
+        workdir_set = any(inst.instruction == "WORKDIR" for inst in custom_instructions)
         if not workdir_set:
             lines.extend(["WORKDIR /app", ""])
 
@@ -131,10 +130,9 @@ class AgentBuilder:
         lines.extend(copy_lines)
 
         # Add EXPOSE instructions from custom dockerfile instructions first
-        expose_instructions = [inst for inst in self.config.dockerfile_instructions if inst.instruction == "EXPOSE"]
+        expose_instructions = placed_instructions["EXPOSE"]
         if expose_instructions:
-            for instruction in expose_instructions:
-                lines.append(instruction.to_dockerfile_line())
+            lines.extend([instruction.to_dockerfile_line() for instruction in expose_instructions])
             lines.append("")
 
         # Add EXPOSE from config.expose_ports if not already handled
@@ -144,10 +142,9 @@ class AgentBuilder:
             lines.append("")
 
         # Add CMD instructions from custom dockerfile instructions first
-        cmd_instructions = [inst for inst in self.config.dockerfile_instructions if inst.instruction == "CMD"]
+        cmd_instructions = placed_instructions["CMD"]
         if cmd_instructions:
-            for instruction in cmd_instructions:
-                lines.append(instruction.to_dockerfile_line())
+            lines.extend([instruction.to_dockerfile_line() for instruction in cmd_instructions])
         elif self.config.cmd:
             # Default command from config
             cmd_str = json.dumps(self.config.cmd)
@@ -1,11 +1,49 @@
 """Agentfile parser module for parsing Agentfile configurations."""
 
+import io
 import json
+import os
+import re
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Union
-
-
-@dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+_QUOTE_CHARS = frozenset(('"', "'"))
+# A whitespace-separated token; quoted sections (closed or running to the end
+# of the line) may contain whitespace and are kept with their quotes
+_TOKEN_RE = re.compile(r"""(?:[^\s"']+|"[^"]*(?:"|$)|'[^']*(?:'|$))+""")
+_TRUE_VALUES = frozenset(('true', '1', 'yes'))
+_VALID_FRAMEWORKS = frozenset(("fast-agent", "agno"))
+_VALID_TRANSPORTS = frozenset(("stdio", "sse", "http"))
+_VALID_PLAN_TYPES = frozenset(("full", "iterative"))
+
+# Instructions whose multiple arguments are rendered in exec (JSON array) form
+_EXEC_FORM_INSTRUCTIONS = frozenset(("CMD", "ENTRYPOINT"))
+
+# Sub-instructions that modify the current context item
+_SUB_INSTRUCTIONS = frozenset(
+    (
+        "COMMAND",
+        "ARGS",
+        "INSTRUCTION",
+        "SERVERS",
+        "AGENTS",
+        "SEQUENCE",
+        "TRANSPORT",
+        "URL",
+        "USE_HISTORY",
+        "HUMAN_INPUT",
+        "PLAN_TYPE",
+        "PLAN_ITERATIONS",
+        "CUMULATIVE",
+        "API_KEY",
+        "BASE_URL",
+        "DEFAULT",
+    )
+)
+
+
+@dataclass(slots=True)
 class MCPServer:
     """Represents an MCP server configuration."""
 
@@ -32,7 +70,7 @@ class MCPServer:
         return config
 
 
-@dataclass
+@dataclass(slots=True)
 class Agent:
     """Represents an agent configuration."""
 
@@ -67,7 +105,7 @@ class Agent:
         return "@fast.agent(\n    " + ",\n    ".join(params) + "\n)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Router:
     """Represents a router workflow."""
 
@@ -97,7 +135,7 @@ class Router:
         return "@fast.router(\n    " + ",\n    ".join(params) + "\n)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Chain:
     """Represents a chain workflow."""
 
@@ -131,7 +169,7 @@ class Chain:
         return "@fast.chain(\n    " + ",\n    ".join(params) + "\n)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Orchestrator:
     """Represents an orchestrator workflow."""
 
@@ -175,7 +213,7 @@ class Orchestrator:
         return "@fast.orchestrator(\n    " + ",\n    ".join(params) + "\n)"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SecretValue:
     """Represents a secret with an inline value."""
 
@@ -183,7 +221,7 @@ class SecretValue:
     value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SecretContext:
     """Represents a secret context that contains multiple key-value pairs."""
 
@@ -195,7 +233,7 @@ class SecretContext:
 SecretType = Union[str, SecretValue, SecretContext]
 
 
-@dataclass
+@dataclass(slots=True)
 class DockerfileInstruction:
     """Represents a Dockerfile instruction."""
 
@@ -204,14 +242,14 @@ class DockerfileInstruction:
 
     def to_dockerfile_line(self) -> str:
         """Convert to Dockerfile line format."""
-        if self.instruction in ["CMD", "ENTRYPOINT"] and len(self.args) > 1:
+        if self.instruction in _EXEC_FORM_INSTRUCTIONS and len(self.args) > 1:
             # Handle array format for CMD/ENTRYPOINT
             args_str = json.dumps(self.args)
             return f"{self.instruction} {args_str}"
         return f"{self.instruction} {' '.join(self.args)}"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentfileConfig:
     """Represents the complete Agentfile configuration."""
 
@@ -229,71 +267,205 @@ class AgentfileConfig:
     dockerfile_instructions: List[DockerfileInstruction] = field(default_factory=list)
 
 
+def _unquote(s: str) -> str:
+    """Remove quotes from a string if present."""
+    if len(s) >= 2 and s[0] == s[-1] and s[0] in _QUOTE_CHARS:
+        return s[1:-1]
+    return s
+
+
+def _exec_form_args(value: str) -> List[str]:
+    """Parse an exec-form (JSON array) argument list such as ["python", "agent.py"]."""
+    try:
+        args = json.loads(value)
+    except ValueError:
+        args = None
+    if isinstance(args, list) and all(isinstance(arg, str) for arg in args):
+        return args
+    # Not a JSON array of strings (e.g. single-quoted items): split on commas
+    return [_unquote(item.strip()) for item in value.strip('[]').split(',')]
+
+
+def _first_arg(parts: List[str]) -> str:
+    """Return the first argument of an instruction, unquoted."""
+    return _unquote(parts[1])
+
+
+def _model_arg(parts: List[str]) -> str:
+    """Return the first argument of an instruction as an interned model name."""
+    return sys.intern(_unquote(parts[1]))
+
+
+def _joined_args(parts: List[str]) -> str:
+    """Return all arguments of an instruction joined into a single string."""
+    return _unquote(' '.join(parts[1:]))
+
+
+def _list_args(parts: List[str]) -> List[str]:
+    """Return all arguments of an instruction as a list."""
+    return [_unquote(part) for part in parts[1:]]
+
+
+def _bool_arg(parts: List[str]) -> bool:
+    """Return the first argument of an instruction as a boolean."""
+    return _unquote(parts[1]).lower() in _TRUE_VALUES
+
+
+def _transport_arg(parts: List[str]) -> str:
+    """Return the first argument of an instruction as a validated transport type."""
+    transport = _unquote(parts[1])
+    if transport not in _VALID_TRANSPORTS:
+        raise ValueError(f"Invalid transport type: {transport}")
+    return sys.intern(transport)
+
+
+def _plan_type_arg(parts: List[str]) -> str:
+    """Return the first argument of an instruction as a validated plan type."""
+    plan_type = _unquote(parts[1])
+    if plan_type not in _VALID_PLAN_TYPES:
+        raise ValueError(f"Invalid plan type: {plan_type}")
+    return sys.intern(plan_type)
+
+
+def _plan_iterations_arg(parts: List[str]) -> int:
+    """Return the first argument of an instruction as a number of plan iterations."""
+    try:
+        return int(parts[1])
+    except ValueError as exc:
+        raise ValueError(f"Invalid number for PLAN_ITERATIONS: {parts[1]}") from exc
+
+
+# Sub-instruction tables: instruction -> (attribute, converter, error raised when arguments are missing)
+_FieldSpec = Tuple[str, Callable[[List[str]], Any], str]
+
+_SERVER_FIELDS: Dict[str, _FieldSpec] = {
+    "COMMAND": ("command", _first_arg, "COMMAND requires a command"),
+    "ARGS": ("args", _list_args, "ARGS requires at least one argument"),
+    "TRANSPORT": ("transport", _transport_arg, "TRANSPORT requires a transport type"),
+    "URL": ("url", _first_arg, "URL requires a URL"),
+}
+
+_AGENT_FIELDS: Dict[str, _FieldSpec] = {
+    "INSTRUCTION": ("instruction", _joined_args, "INSTRUCTION requires instruction text"),
+    "SERVERS": ("servers", _list_args, "SERVERS requires at least one server name"),
+    "MODEL": ("model", _model_arg, "MODEL requires a model name"),
+    "USE_HISTORY": ("use_history", _bool_arg, "USE_HISTORY requires true/false"),
+    "HUMAN_INPUT": ("human_input", _bool_arg, "HUMAN_INPUT requires true/false"),
+    "DEFAULT": ("default", _bool_arg, "DEFAULT requires true/false"),
+}
+
+_ROUTER_FIELDS: Dict[str, _FieldSpec] = {
+    "AGENTS": ("agents", _list_args, "AGENTS requires at least one agent name"),
+    "MODEL": ("model", _model_arg, "MODEL requires a model name"),
+    "INSTRUCTION": ("instruction", _joined_args, "INSTRUCTION requires instruction text"),
+    "DEFAULT": ("default", _bool_arg, "DEFAULT requires true/false"),
+}
+
+_CHAIN_FIELDS: Dict[str, _FieldSpec] = {
+    "SEQUENCE": ("sequence", _list_args, "SEQUENCE requires at least one agent name"),
+    "INSTRUCTION": ("instruction", _joined_args, "INSTRUCTION requires instruction text"),
+    "CUMULATIVE": ("cumulative", _bool_arg, "CUMULATIVE requires true/false"),
+    "CONTINUE_WITH_FINAL": ("continue_with_final", _bool_arg, "CONTINUE_WITH_FINAL requires true/false"),
+    "DEFAULT": ("default", _bool_arg, "DEFAULT requires true/false"),
+}
+
+_ORCHESTRATOR_FIELDS: Dict[str, _FieldSpec] = {
+    "AGENTS": ("agents", _list_args, "AGENTS requires at least one agent name"),
+    "MODEL": ("model", _model_arg, "MODEL requires a model name"),
+    "INSTRUCTION": ("instruction", _joined_args, "INSTRUCTION requires instruction text"),
+    "PLAN_TYPE": ("plan_type", _plan_type_arg, "PLAN_TYPE requires a plan type"),
+    "PLAN_ITERATIONS": ("plan_iterations", _plan_iterations_arg, "PLAN_ITERATIONS requires a number"),
+    "HUMAN_INPUT": ("human_input", _bool_arg, "HUMAN_INPUT requires true/false"),
+    "DEFAULT": ("default", _bool_arg, "DEFAULT requires true/false"),
+}
+
+
 class AgentfileParser:
     """Parser for Agentfile format."""
 
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Discard all parsed state so the parser can be reused for another Agentfile."""
         self.config = AgentfileConfig()
         self.current_context = None
         self.current_item = None
+        # Ports already recorded in config.expose_ports, for O(1) de-duplication
+        self._exposed_ports: Set[int] = set()
+        # Secret contexts in config.secrets by name, for O(1) lookup
+        self._secret_contexts: Dict[str, SecretContext] = {}
+
+    def parse_file(self, filepath: Union[str, os.PathLike, TextIO]) -> AgentfileConfig:
+        """Parse an Agentfile and return the configuration.
 
-    def parse_file(self, filepath: str) -> AgentfileConfig:
-        """Parse an Agentfile and return the configuration."""
+        ``filepath`` may also be an open text stream, which is read as-is and
+        left open.
+        """
+        if hasattr(filepath, 'read'):
+            return self._parse_lines(filepath)
+        # Stream the file line by line rather than reading it into memory first
         with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return self.parse_content(content)
+            return self._parse_lines(f)
 
     def parse_content(self, content: str) -> AgentfileConfig:
         """Parse Agentfile content and return the configuration."""
-        lines = content.split('\n')
+        # Iterate the string like a file instead of splitting it into a list
+        return self._parse_lines(io.StringIO(content))
+
+    def _parse_lines(self, lines: Iterable[str]) -> AgentfileConfig:
+        """Parse physical Agentfile lines and return the configuration."""
+        # Each logical line is parsed as soon as it is complete, so the content
+        # is walked once instead of being buffered into an intermediate list.
+        for line_num, line in self._iter_logical_lines(lines):
+            try:
+                self._parse_line(line)
+            except Exception as e:
+                raise ValueError(f"Error parsing line {line_num}: {line}\n{str(e)}") from e
+
+        return self.config
+
+    def _iter_logical_lines(self, lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        """Yield (line number, line) pairs with backslash continuations joined.
 
-        # Pre-process lines to handle multi-line continuations with backslash
-        processed_lines = []
-        current_line = ""
-        continued_start_line_num = None
+        Empty lines and comments are skipped. Continued lines are reported with
+        the line number on which they start.
+        """
+        fragments: List[str] = []
+        start_line_num = 0
 
         for line_num, line in enumerate(lines, 1):
             line = line.rstrip()  # Remove trailing whitespace but keep leading
 
-            # Skip empty lines and comments if not part of a continuation
-            if not current_line and (not line or line.lstrip().startswith('#')):
-                continue
+            if not fragments:
+                # Skip empty lines and comments if not part of a continuation
+                stripped = line.lstrip()
+                if not stripped or stripped.startswith('#'):
+                    continue
+                if not stripped.endswith('\\'):
+                    # A complete single-line instruction, already trimmed
+                    yield line_num, stripped
+                    continue
+                start_line_num = line_num
 
             # Check for line continuation
             if line.endswith('\\'):
-                # Remove the backslash and add to current line with a space
-                if not current_line:
-                    # This is the start of a new continued line, so record the starting line number
-                    continued_start_line_num = line_num
-                current_line += f"{line[:-1].rstrip()} "
-            else:
-                # Complete the line
-                current_line += line
-                if current_line.strip():  # Only add non-empty lines
-                    # Use the real start line number for continued instructions
-                    if continued_start_line_num is not None:
-                        processed_lines.append((continued_start_line_num, current_line.strip()))
-                        continued_start_line_num = None
-                    else:
-                        processed_lines.append((line_num, current_line.strip()))
-                current_line = ""
-
-        # Handle any remaining line (shouldn't happen with proper syntax)
-        if current_line.strip():
-            # Use the real start line number for continued instructions if present
-            if continued_start_line_num is not None:
-                processed_lines.append((continued_start_line_num, current_line.strip()))
-            else:
-                processed_lines.append((len(lines), current_line.strip()))
+                # Collect the line without its backslash; fragments are joined
+                # with single spaces once the logical line is complete
+                fragments.append(line[:-1].rstrip())
+                continue
 
-        # Parse each processed line
-        for line_num, line in processed_lines:
-            try:
-                self._parse_line(line)
-            except Exception as e:
-                raise ValueError(f"Error parsing line {line_num}: {line}\n{str(e)}") from e
+            fragments.append(line)
+            logical_line = ' '.join(fragments).strip()
+            fragments.clear()
+            if logical_line:  # Only yield non-empty lines
+                # Continued instructions are reported at the line they start on
+                yield start_line_num, logical_line
 
-        return self.config
+        # Handle any remaining line (shouldn't happen with proper syntax)
+        logical_line = ' '.join(fragments).strip()
+        if logical_line:
+            yield start_line_num, logical_line
 
     def _parse_line(self, line: str):
         """Parse a single line of the Agentfile."""
@@ -302,164 +474,62 @@ class AgentfileParser:
         if not parts:
             return
 
-        instruction = parts[0].upper()
+        # Interned so the handler lookup compares by identity and every stored
+        # DockerfileInstruction of the same type shares one keyword string
+        instruction = sys.intern(parts[0].upper())
 
-        # Agentman-specific instructions (not Docker)
-        if instruction == "MODEL":
-            # Check if we're in a context that should handle MODEL as sub-instruction
-            if self.current_context in ["agent"]:
-                self._handle_sub_instruction(instruction, parts)
-            else:
-                self._handle_model(parts)
-        elif instruction == "FRAMEWORK":
-            self._handle_framework(parts)
-        elif instruction in ["SERVER", "MCP_SERVER"]:
-            self._handle_server(parts)
-        elif instruction == "AGENT":
-            self._handle_agent(parts)
-        elif instruction == "ROUTER":
-            self._handle_router(parts)
-        elif instruction == "CHAIN":
-            self._handle_chain(parts)
-        elif instruction == "ORCHESTRATOR":
-            self._handle_orchestrator(parts)
-        elif instruction == "SECRET":
-            self._handle_secret(parts)
-        # Dockerfile instructions - handle specially where needed
-        elif instruction == "FROM":
-            self._handle_from(parts)
-            self._handle_dockerfile_instruction(instruction, parts)
-        elif instruction == "EXPOSE":
-            self._handle_expose(parts)
-            self._handle_dockerfile_instruction(instruction, parts)
-        elif instruction == "CMD":
-            self._handle_cmd(parts)
-            # Store the CMD instruction with the correctly parsed args
-            dockerfile_instruction = DockerfileInstruction(instruction="CMD", args=self.config.cmd)
-            self.config.dockerfile_instructions.append(dockerfile_instruction)
-        elif instruction == "RUN":
-            self._handle_dockerfile_instruction(instruction, parts)
-        # All other Dockerfile instructions - store as-is
-        elif instruction in [
-            # Standard Dockerfile instructions
-            "ARG",
-            "ADD",
-            "COPY",
-            "ENTRYPOINT",
-            "HEALTHCHECK",
-            "LABEL",
-            "MAINTAINER",
-            "ONBUILD",
-            "SHELL",
-            "STOPSIGNAL",
-            "USER",
-            "VOLUME",
-            "WORKDIR",
-            # BuildKit instructions
-            "MOUNT",
-            "BUILDKIT",
-        ]:
-            self._handle_dockerfile_instruction(instruction, parts)
-        # Sub-instructions for contexts
-        elif instruction in [
-            "COMMAND",
-            "ARGS",
-            "INSTRUCTION",
-            "SERVERS",
-            "AGENTS",
-            "SEQUENCE",
-            "TRANSPORT",
-            "URL",
-            "USE_HISTORY",
-            "HUMAN_INPUT",
-            "PLAN_TYPE",
-            "PLAN_ITERATIONS",
-            "CUMULATIVE",
-            "API_KEY",
-            "BASE_URL",
-            "DEFAULT",
-        ]:
+        handler = self._INSTRUCTION_HANDLERS.get(instruction)
+        if handler is not None:
+            handler(self, parts)
+        elif instruction in _SUB_INSTRUCTIONS:
+            # Sub-instructions for contexts
             self._handle_sub_instruction(instruction, parts)
-        # Handle ENV - could be Dockerfile instruction or sub-instruction
-        elif instruction == "ENV":
-            if self.current_context and self.current_context == "server":
-                # It's a sub-instruction for SERVER context
-                self._handle_sub_instruction(instruction, parts)
-            else:
-                # It's a Dockerfile instruction
-                self._handle_dockerfile_instruction(instruction, parts)
         else:
-            # Unknown instruction - treat as potential Dockerfile instruction
-            # for forward compatibility
+            # RUN, the other standard Dockerfile and BuildKit instructions, and
+            # unknown instructions (for forward compatibility) are stored as-is
             self._handle_dockerfile_instruction(instruction, parts)
 
     def _split_respecting_quotes(self, line: str) -> List[str]:
         """Split line by whitespace but respect quoted strings."""
-        parts = []
-        current = ""
-        in_quotes = False
-        quote_char = None
-
-        i = 0
-        while i < len(line):
-            char = line[i]
-
-            if not in_quotes and char in ['"', "'"]:
-                in_quotes = True
-                quote_char = char
-                current += char
-            elif in_quotes and char == quote_char:
-                in_quotes = False
-                quote_char = None
-                current += char
-            elif not in_quotes and char.isspace():
-                if current:
-                    parts.append(current)
-                    current = ""
-            else:
-                current += char
-            i += 1
-
-        if current:
-            parts.append(current)
-
-        return parts
+        # Most lines contain no quotes; plain str.split() is enough for those
+        if '"' not in line and "'" not in line:
+            return line.split()
 
-    def _unquote(self, s: str) -> str:
-        """Remove quotes from a string if present."""
-        if len(s) >= 2 and s[0] == s[-1] and s[0] in ['"', "'"]:
-            return s[1:-1]
-        return s
+        return _TOKEN_RE.findall(line)
 
     def _handle_from(self, parts: List[str]):
         """Handle FROM instruction."""
         if len(parts) < 2:
             raise ValueError("FROM requires a base image")
-        self.config.base_image = self._unquote(parts[1])
-        self.current_context = None
+        self.config.base_image = _unquote(parts[1])
+        self._handle_dockerfile_instruction("FROM", parts)
 
     def _handle_model(self, parts: List[str]):
         """Handle MODEL instruction."""
+        # Inside an AGENT, MODEL sets the agent's model rather than the default
+        if self.current_context == "agent":
+            self._handle_sub_instruction("MODEL", parts)
+            return
         if len(parts) < 2:
             raise ValueError("MODEL requires a model name")
-        self.config.default_model = self._unquote(parts[1])
+        self.config.default_model = _model_arg(parts)
         self.current_context = None
 
     def _handle_framework(self, parts: List[str]):
         """Handle FRAMEWORK instruction."""
         if len(parts) < 2:
             raise ValueError("FRAMEWORK requires a framework name")
-        framework = self._unquote(parts[1]).lower()
-        if framework not in ["fast-agent", "agno"]:
+        framework = _unquote(parts[1]).lower()
+        if framework not in _VALID_FRAMEWORKS:
             raise ValueError(f"Unsupported framework: {framework}. Supported: fast-agent, agno")
-        self.config.framework = framework
+        self.config.framework = sys.intern(framework)
         self.current_context = None
 
     def _handle_server(self, parts: List[str]):
         """Handle SERVER instruction."""
         if len(parts) < 2:
             raise ValueError("SERVER requires a server name")
-        name = self._unquote(parts[1])
+        name = sys.intern(_unquote(parts[1]))
         self.config.servers[name] = MCPServer(name=name)
         self.current_context = "server"
         self.current_item = name
@@ -468,7 +538,7 @@ class AgentfileParser:
         """Handle AGENT instruction."""
         if len(parts) < 2:
             raise ValueError("AGENT requires an agent name")
-        name = self._unquote(parts[1])
+        name = sys.intern(_unquote(parts[1]))
         self.config.agents[name] = Agent(name=name)
         self.current_context = "agent"
         self.current_item = name
@@ -477,7 +547,7 @@ class AgentfileParser:
         """Handle ROUTER instruction."""
         if len(parts) < 2:
             raise ValueError("ROUTER requires a router name")
-        name = self._unquote(parts[1])
+        name = sys.intern(_unquote(parts[1]))
         self.config.routers[name] = Router(name=name)
         self.current_context = "router"
         self.current_item = name
@@ -486,7 +556,7 @@ class AgentfileParser:
         """Handle CHAIN instruction."""
         if len(parts) < 2:
             raise ValueError("CHAIN requires a chain name")
-        name = self._unquote(parts[1])
+        name = sys.intern(_unquote(parts[1]))
         self.config.chains[name] = Chain(name=name)
         self.current_context = "chain"
         self.current_item = name
@@ -495,7 +565,7 @@ class AgentfileParser:
         """Handle ORCHESTRATOR instruction."""
         if len(parts) < 2:
             raise ValueError("ORCHESTRATOR requires an orchestrator name")
-        name = self._unquote(parts[1])
+        name = sys.intern(_unquote(parts[1]))
         self.config.orchestrators[name] = Orchestrator(name=name)
         self.current_context = "orchestrator"
         self.current_item = name
@@ -511,61 +581,47 @@ class AgentfileParser:
         if len(parts) < 2:
             raise ValueError("SECRET requires a secret name")
 
-        secret_name = self._unquote(parts[1])
+        secret_name = _unquote(parts[1])
 
         # Check if it's an inline value: SECRET KEY value
         if len(parts) >= 3:
             value = ' '.join(parts[2:])  # Join all remaining parts as the value
-            secret = SecretValue(name=secret_name, value=self._unquote(value))
+            secret = SecretValue(name=secret_name, value=_unquote(value))
             self.config.secrets.append(secret)
             self.current_context = None
         # Check if it's a context (no value, will be populated with sub-instructions)
         elif len(parts) == 2:
-            # Check if a secret context with this name already exists
-            existing_secret = next(
-                (
-                    secret
-                    for secret in self.config.secrets
-                    if isinstance(secret, SecretContext) and secret.name == secret_name
-                ),
-                None,
-            )
-
-            if existing_secret:
-                # Reuse existing secret context
-                self.current_context = "secret"
-                self.current_item = secret_name
-            else:
+            # Reuse an existing secret context with this name if there is one
+            if self._find_secret_context(secret_name) is None:
                 # Create a new secret context - this will be used if subsequent
                 # lines contain key-value pairs. If no key-value pairs follow,
                 # it will be treated as a simple reference
-                secret = SecretContext(name=secret_name)
-                self.config.secrets.append(secret)
-                self.current_context = "secret"
-                self.current_item = secret_name
+                secret_context = SecretContext(name=secret_name)
+                self.config.secrets.append(secret_context)
+                self._secret_contexts[secret_name] = secret_context
+            self.current_context = "secret"
+            self.current_item = secret_name
         else:
             raise ValueError("Invalid SECRET format. Use: SECRET NAME or SECRET NAME value")
 
+    def _find_secret_context(self, name: str) -> Optional[SecretContext]:
+        """Return the secret context with the given name, if one has been defined."""
+        return self._secret_contexts.get(name)
+
     def _handle_secret_sub_instruction(self, instruction: str, parts: List[str]):
         """Handle sub-instructions for SECRET context (key-value pairs)."""
         if not self.current_item:
             raise ValueError("SECRET sub-instruction without active secret context")
 
-        # Find the current secret context
-        secret_context = None
-        for secret in self.config.secrets:
-            if isinstance(secret, SecretContext) and secret.name == self.current_item:
-                secret_context = secret
-                break
-
-        if not secret_context:
+        secret_context = self._find_secret_context(self.current_item)
+        if secret_context is None:
             raise ValueError(f"Secret context {self.current_item} not found")
 
         # Handle key-value pairs like: API_KEY your_key_here
         if len(parts) >= 2:
-            key = instruction.upper()
+            key = instruction  # already upper-cased and interned by _parse_line
             value = ' '.join(parts[1:])
-            secret_context.values[key] = self._unquote(value)
+            secret_context.values[key] = _unquote(value)
         else:
             raise ValueError("SECRET context requires KEY VALUE format")
 
@@ -573,13 +629,16 @@ class AgentfileParser:
         """Handle EXPOSE instruction."""
         if len(parts) < 2:
             raise ValueError("EXPOSE requires a port number")
+        # EXPOSE may list several ports, e.g. EXPOSE 8080 9090
         try:
-            port = int(parts[1])
-            if port not in self.config.expose_ports:
-                self.config.expose_ports.append(port)
+            ports = list(map(int, parts[1:]))
         except ValueError as exc:
-            raise ValueError(f"Invalid port number: {parts[1]}") from exc
-        self.current_context = None
+            raise ValueError(f"Invalid port number: {' '.join(parts[1:])}") from exc
+        for port in ports:
+            if port not in self._exposed_ports:
+                self._exposed_ports.add(port)
+                self.config.expose_ports.append(port)
+        self._handle_dockerfile_instruction("EXPOSE", parts)
 
     def _handle_cmd(self, parts: List[str]):
         """Handle CMD instruction."""
@@ -588,15 +647,21 @@ class AgentfileParser:
         # Handle both array format and simple format
         if parts[1].startswith('[') and parts[-1].endswith(']'):
             # Array format: CMD ["python", "agent.py"]
-            cmd_str = ' '.join(parts[1:])
-            # Simple JSON-like parsing
-            cmd_str = cmd_str.strip('[]')
-            self.config.cmd = [self._unquote(item.strip()) for item in cmd_str.split(',')]
+            self.config.cmd = _exec_form_args(' '.join(parts[1:]))
         else:
             # Simple format: CMD python agent.py
-            self.config.cmd = [self._unquote(part) for part in parts[1:]]
+            self.config.cmd = [_unquote(part) for part in parts[1:]]
+        # Store the CMD instruction with the correctly parsed args
+        self.config.dockerfile_instructions.append(DockerfileInstruction(instruction="CMD", args=self.config.cmd))
         self.current_context = None
 
+    def _handle_env(self, parts: List[str]):
+        """Handle ENV instruction, either a SERVER sub-instruction or a Dockerfile instruction."""
+        if self.current_context == "server":
+            self._handle_sub_instruction("ENV", parts)
+        else:
+            self._handle_dockerfile_instruction("ENV", parts)
+
     def _handle_dockerfile_instruction(self, instruction: str, parts: List[str]):
         """Handle any generic Dockerfile instruction."""
         if len(parts) < 2:
@@ -625,182 +690,102 @@ class AgentfileParser:
         if not self.current_context:
             # Special case: if we're not in a context but this looks like
             # a key-value pair for a secret context, try to handle it
-            if self.current_item and any(
-                isinstance(s, SecretContext) and s.name == self.current_item for s in self.config.secrets
-            ):
+            if self.current_item and self._find_secret_context(self.current_item) is not None:
                 self.current_context = "secret"
                 self._handle_secret_sub_instruction(instruction, parts)
                 return
             raise ValueError(f"{instruction} can only be used within a context (SERVER, AGENT, etc.)")
 
-        if self.current_context == "server":
-            self._handle_server_sub_instruction(instruction, parts)
-        elif self.current_context == "agent":
-            self._handle_agent_sub_instruction(instruction, parts)
-        elif self.current_context == "router":
-            self._handle_router_sub_instruction(instruction, parts)
-        elif self.current_context == "chain":
-            self._handle_chain_sub_instruction(instruction, parts)
-        elif self.current_context == "orchestrator":
-            self._handle_orchestrator_sub_instruction(instruction, parts)
-        elif self.current_context == "secret":
-            self._handle_secret_sub_instruction(instruction, parts)
+        handler = self._SUB_INSTRUCTION_HANDLERS.get(self.current_context)
+        if handler is not None:
+            handler(self, instruction, parts)
 
     def _handle_server_sub_instruction(self, instruction: str, parts: List[str]):
         """Handle sub-instructions for SERVER context."""
         server = self.config.servers[self.current_item]
 
-        if instruction == "COMMAND":
-            if len(parts) < 2:
-                raise ValueError("COMMAND requires a command")
-            server.command = self._unquote(parts[1])
-        elif instruction == "ARGS":
-            if len(parts) < 2:
-                raise ValueError("ARGS requires at least one argument")
-            server.args = [self._unquote(part) for part in parts[1:]]
-        elif instruction == "TRANSPORT":
-            if len(parts) < 2:
-                raise ValueError("TRANSPORT requires a transport type")
-            transport = self._unquote(parts[1])
-            if transport not in ["stdio", "sse", "http"]:
-                raise ValueError(f"Invalid transport type: {transport}")
-            server.transport = transport
-        elif instruction == "URL":
-            if len(parts) < 2:
-                raise ValueError("URL requires a URL")
-            server.url = self._unquote(parts[1])
-        elif instruction == "ENV":
-            if len(parts) < 2:
-                raise ValueError("ENV requires KEY VALUE or KEY=VALUE")
+        if instruction == "ENV":
+            self._handle_server_env(server, parts)
+        else:
+            self._apply_field(server, _SERVER_FIELDS, instruction, parts)
 
-            if len(parts) == 2:
-                # Handle KEY=VALUE format
-                env_part = parts[1]
-                if '=' in env_part:
-                    key, value = env_part.split('=', 1)  # Split only on first =
-                    key = self._unquote(key)
-                    value = self._unquote(value)
-                    server.env[key] = value
-                else:
-                    raise ValueError("ENV requires KEY VALUE or KEY=VALUE")
-            elif len(parts) >= 3:
-                # Handle KEY VALUE format
-                key = self._unquote(parts[1])
-                value = self._unquote(' '.join(parts[2:]))  # Join remaining parts as value
+    def _handle_server_env(self, server: MCPServer, parts: List[str]):
+        """Handle ENV sub-instruction for SERVER context."""
+        if len(parts) < 2:
+            raise ValueError("ENV requires KEY VALUE or KEY=VALUE")
+
+        if len(parts) == 2:
+            # Handle KEY=VALUE format
+            env_part = parts[1]
+            if '=' in env_part:
+                key, value = env_part.split('=', 1)  # Split only on first =
+                key = _unquote(key)
+                value = _unquote(value)
                 server.env[key] = value
             else:
                 raise ValueError("ENV requires KEY VALUE or KEY=VALUE")
+        else:
+            # Handle KEY VALUE format
+            key = _unquote(parts[1])
+            value = _unquote(' '.join(parts[2:]))  # Join remaining parts as value
+            server.env[key] = value
 
     def _handle_agent_sub_instruction(self, instruction: str, parts: List[str]):
         """Handle sub-instructions for AGENT context."""
-        agent = self.config.agents[self.current_item]
-
-        if instruction == "INSTRUCTION":
-            if len(parts) < 2:
-                raise ValueError("INSTRUCTION requires instruction text")
-            agent.instruction = self._unquote(' '.join(parts[1:]))
-        elif instruction == "SERVERS":
-            if len(parts) < 2:
-                raise ValueError("SERVERS requires at least one server name")
-            agent.servers = [self._unquote(part) for part in parts[1:]]
-        elif instruction == "MODEL":
-            if len(parts) < 2:
-                raise ValueError("MODEL requires a model name")
-            agent.model = self._unquote(parts[1])
-        elif instruction == "USE_HISTORY":
-            if len(parts) < 2:
-                raise ValueError("USE_HISTORY requires true/false")
-            agent.use_history = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
-        elif instruction == "HUMAN_INPUT":
-            if len(parts) < 2:
-                raise ValueError("HUMAN_INPUT requires true/false")
-            agent.human_input = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
-        elif instruction == "DEFAULT":
-            if len(parts) < 2:
-                raise ValueError("DEFAULT requires true/false")
-            agent.default = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
+        self._apply_field(self.config.agents[self.current_item], _AGENT_FIELDS, instruction, parts)
 
     def _handle_router_sub_instruction(self, instruction: str, parts: List[str]):
         """Handle sub-instructions for ROUTER context."""
-        router = self.config.routers[self.current_item]
-
-        if instruction == "AGENTS":
-            if len(parts) < 2:
-                raise ValueError("AGENTS requires at least one agent name")
-            router.agents = [self._unquote(part) for part in parts[1:]]
-        elif instruction == "MODEL":
-            if len(parts) < 2:
-                raise ValueError("MODEL requires a model name")
-            router.model = self._unquote(parts[1])
-        elif instruction == "INSTRUCTION":
-            if len(parts) < 2:
-                raise ValueError("INSTRUCTION requires instruction text")
-            router.instruction = self._unquote(' '.join(parts[1:]))
-        elif instruction == "DEFAULT":
-            if len(parts) < 2:
-                raise ValueError("DEFAULT requires true/false")
-            router.default = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
+        self._apply_field(self.config.routers[self.current_item], _ROUTER_FIELDS, instruction, parts)
 
     def _handle_chain_sub_instruction(self, instruction: str, parts: List[str]):
         """Handle sub-instructions for CHAIN context."""
-        chain = self.config.chains[self.current_item]
-
-        if instruction == "SEQUENCE":
-            if len(parts) < 2:
-                raise ValueError("SEQUENCE requires at least one agent name")
-            chain.sequence = [self._unquote(part) for part in parts[1:]]
-        elif instruction == "INSTRUCTION":
-            if len(parts) < 2:
-                raise ValueError("INSTRUCTION requires instruction text")
-            chain.instruction = self._unquote(' '.join(parts[1:]))
-        elif instruction == "CUMULATIVE":
-            if len(parts) < 2:
-                raise ValueError("CUMULATIVE requires true/false")
-            chain.cumulative = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
-        elif instruction == "CONTINUE_WITH_FINAL":
-            if len(parts) < 2:
-                raise ValueError("CONTINUE_WITH_FINAL requires true/false")
-            chain.continue_with_final = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
-        elif instruction == "DEFAULT":
-            if len(parts) < 2:
-                raise ValueError("DEFAULT requires true/false")
-            chain.default = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
+        self._apply_field(self.config.chains[self.current_item], _CHAIN_FIELDS, instruction, parts)
 
     def _handle_orchestrator_sub_instruction(self, instruction: str, parts: List[str]):
         """Handle sub-instructions for ORCHESTRATOR context."""
-        orchestrator = self.config.orchestrators[self.current_item]
-
-        if instruction == "AGENTS":
-            if len(parts) < 2:
-                raise ValueError("AGENTS requires at least one agent name")
-            orchestrator.agents = [self._unquote(part) for part in parts[1:]]
-        elif instruction == "MODEL":
-            if len(parts) < 2:
-                raise ValueError("MODEL requires a model name")
-            orchestrator.model = self._unquote(parts[1])
-        elif instruction == "INSTRUCTION":
-            if len(parts) < 2:
-                raise ValueError("INSTRUCTION requires instruction text")
-            orchestrator.instruction = self._unquote(' '.join(parts[1:]))
-        elif instruction == "PLAN_TYPE":
-            if len(parts) < 2:
-                raise ValueError("PLAN_TYPE requires a plan type")
-            plan_type = self._unquote(parts[1])
-            if plan_type not in ["full", "iterative"]:
-                raise ValueError(f"Invalid plan type: {plan_type}")
-            orchestrator.plan_type = plan_type
-        elif instruction == "PLAN_ITERATIONS":
-            if len(parts) < 2:
-                raise ValueError("PLAN_ITERATIONS requires a number")
-            try:
-                orchestrator.plan_iterations = int(parts[1])
-            except ValueError as exc:
-                raise ValueError(f"Invalid number for PLAN_ITERATIONS: {parts[1]}") from exc
-        elif instruction == "HUMAN_INPUT":
-            if len(parts) < 2:
-                raise ValueError("HUMAN_INPUT requires true/false")
-            orchestrator.human_input = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
-        elif instruction == "DEFAULT":
-            if len(parts) < 2:
-                raise ValueError("DEFAULT requires true/false")
-            orchestrator.default = self._unquote(parts[1]).lower() in ['true', '1', 'yes']
+        self._apply_field(self.config.orchestrators[self.current_item], _ORCHESTRATOR_FIELDS, instruction, parts)
+
+    @staticmethod
+    def _apply_field(item: Any, fields: Dict[str, _FieldSpec], instruction: str, parts: List[str]):
+        """Set the attribute described by ``fields[instruction]`` on ``item``.
+
+        Sub-instructions without an entry in ``fields`` are ignored.
+        """
+        spec = fields.get(instruction)
+        if spec is None:
+            return
+        attr, convert, error = spec
+        if len(parts) < 2:
+            raise ValueError(error)
+        setattr(item, attr, convert(parts))
+
+    # Instructions with dedicated handlers, called as handler(self, parts).
+    # Anything else is a context sub-instruction or a Dockerfile instruction.
+    _INSTRUCTION_HANDLERS: Dict[str, Callable[["AgentfileParser", List[str]], None]] = {
+        # Agentman-specific instructions (not Docker)
+        "MODEL": _handle_model,
+        "FRAMEWORK": _handle_framework,
+        "SERVER": _handle_server,
+        "MCP_SERVER": _handle_server,
+        "AGENT": _handle_agent,
+        "ROUTER": _handle_router,
+        "CHAIN": _handle_chain,
+        "ORCHESTRATOR": _handle_orchestrator,
+        "SECRET": _handle_secret,
+        # Dockerfile instructions that also update the configuration
+        "FROM": _handle_from,
+        "EXPOSE": _handle_expose,
+        "CMD": _handle_cmd,
+        "ENV": _handle_env,
+    }
+
+    # Context -> handler(self, instruction, parts) for its sub-instructions
+    _SUB_INSTRUCTION_HANDLERS: Dict[str, Callable[["AgentfileParser", str, List[str]], None]] = {
+        "server": _handle_server_sub_instruction,
+        "agent": _handle_agent_sub_instruction,
+        "router": _handle_router_sub_instruction,
+        "chain": _handle_chain_sub_instruction,
+        "orchestrator": _handle_orchestrator_sub_instruction,
+        "secret": _handle_secret_sub_instruction,
+    }
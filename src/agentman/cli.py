@@ -41,11 +41,7 @@ def resolve_context_path(path):
 def safe_subprocess_run(cmd_args, check=True):
     """Safely run subprocess with validated arguments."""
     # Ensure all arguments are strings and properly escaped
-    safe_args = []
-    for arg in cmd_args:
-        if not isinstance(arg, str):
-            arg = str(arg)
-        safe_args.append(arg)
+    safe_args = [arg if isinstance(arg, str) else str(arg) for arg in cmd_args]
 
     return subprocess.run(safe_args, check=check)
 
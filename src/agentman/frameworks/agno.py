@@ -4,6 +4,16 @@ from typing import List
 
 from .base import BaseFramework
 
+# MCP server names that map onto built-in Agno tools
+_SEARCH_SERVERS = frozenset(("web_search", "search", "browser"))
+_FINANCE_SERVERS = frozenset(("finance", "yfinance", "stock"))
+_FILE_SERVERS = frozenset(("file", "filesystem"))
+_SHELL_SERVERS = frozenset(("shell", "terminal"))
+_PYTHON_SERVERS = frozenset(("python", "code"))
+
+_OPENAI_SECRETS = frozenset(("OPENAI_API_KEY", "OPENAI_BASE_URL"))
+_API_KEY_SECRETS = frozenset(("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GROQ_API_KEY", "GOOGLE_API_KEY"))
+
 
 class AgnoFramework(BaseFramework):
     """Framework implementation for Agno."""
@@ -66,20 +76,19 @@ class AgnoFramework(BaseFramework):
         if has_servers:
             # Map server types to appropriate tools
             for server_name, server in self.config.servers.items():
-                if server_name in ["web_search", "search", "browser"]:
+                if server_name in _SEARCH_SERVERS:
                     tool_imports.append("from agno.tools.duckduckgo import DuckDuckGoTools")
-                elif server_name in ["finance", "yfinance", "stock"]:
+                elif server_name in _FINANCE_SERVERS:
                     tool_imports.append("from agno.tools.yfinance import YFinanceTools")
-                elif server_name in ["file", "filesystem"]:
+                elif server_name in _FILE_SERVERS:
                     tool_imports.append("from agno.tools.file import FileTools")
-                elif server_name in ["shell", "terminal"]:
+                elif server_name in _SHELL_SERVERS:
                     tool_imports.append("from agno.tools.shell import ShellTools")
-                elif server_name in ["python", "code"]:
+                elif server_name in _PYTHON_SERVERS:
                     tool_imports.append("from agno.tools.python import PythonTools")
 
         # Remove duplicates and add to imports
-        for tool_import in sorted(set(tool_imports)):
-            imports.append(tool_import)
+        imports.extend(sorted(set(tool_imports)))
 
         # Team imports if multiple agents
         if has_multiple_agents:
@@ -126,15 +135,15 @@ class AgnoFramework(BaseFramework):
             tools = []
             if agent.servers:
                 for server_name in agent.servers:
-                    if server_name in ["web_search", "search", "browser"]:
+                    if server_name in _SEARCH_SERVERS:
                         tools.append("DuckDuckGoTools()")
-                    elif server_name in ["finance", "yfinance", "stock"]:
+                    elif server_name in _FINANCE_SERVERS:
                         tools.append("YFinanceTools(stock_price=True, analyst_recommendations=True)")
-                    elif server_name in ["file", "filesystem"]:
+                    elif server_name in _FILE_SERVERS:
                         tools.append("FileTools()")
-                    elif server_name in ["shell", "terminal"]:
+                    elif server_name in _SHELL_SERVERS:
                         tools.append("ShellTools()")
-                    elif server_name in ["python", "code"]:
+                    elif server_name in _PYTHON_SERVERS:
                         tools.append("PythonTools()")
 
             # Always add reasoning tools for better performance
@@ -251,8 +260,8 @@ class AgnoFramework(BaseFramework):
         else:
             # Check if we have OpenAI-like environment variables configured
             has_openai_config = any(
-                (isinstance(secret, str) and secret in ["OPENAI_API_KEY", "OPENAI_BASE_URL"])
-                or (hasattr(secret, 'name') and secret.name in ["OPENAI_API_KEY", "OPENAI_BASE_URL"])
+                (isinstance(secret, str) and secret in _OPENAI_SECRETS)
+                or (hasattr(secret, 'name') and secret.name in _OPENAI_SECRETS)
                 for secret in self.config.secrets
             )
 
@@ -492,7 +501,7 @@ class AgnoFramework(BaseFramework):
         # Process secrets to generate environment variables
         for secret in self.config.secrets:
             if isinstance(secret, str):
-                if secret in ["OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GROQ_API_KEY", "GOOGLE_API_KEY"]:
+                if secret in _API_KEY_SECRETS:
                     env_lines.append(f"# {secret}=your-key-here")
                 else:
                     env_lines.append(f"# {secret}=your-value-here")
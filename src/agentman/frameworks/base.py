@@ -6,6 +6,9 @@ from pathlib import Path
 
 from agentman.agentfile_parser import AgentfileConfig
 
+# Official providers that don't need custom base URLs
+_OFFICIAL_PROVIDERS = frozenset(("openai", "anthropic"))
+
 
 class BaseFramework(ABC):
     """Base class for framework implementations."""
@@ -44,7 +47,7 @@ class BaseFramework(ABC):
         if self.config.default_model and "/" in self.config.default_model:
             provider = self.config.default_model.split("/")[0]
             # Skip official providers that don't need custom base URLs
-            if provider.lower() not in ["openai", "anthropic"]:
+            if provider.lower() not in _OFFICIAL_PROVIDERS:
                 providers.add(provider)
 
         # Check agent models
@@ -52,7 +55,7 @@ class BaseFramework(ABC):
             if agent.model and "/" in agent.model:
                 provider = agent.model.split("/")[0]
                 # Skip official providers that don't need custom base URLs
-                if provider.lower() not in ["openai", "anthropic"]:
+                if provider.lower() not in _OFFICIAL_PROVIDERS:
                     providers.add(provider)
 
         return providers
@@ -1,11 +1,23 @@
 """Fast-Agent framework implementation for AgentMan."""
 
 from typing import List
-import yaml
 
 from .base import BaseFramework
 
 
+def _dump_yaml(data, stream) -> None:
+    """Write data to stream as block-style YAML.
+
+    PyYAML is imported on first use so that importing the frameworks package
+    (e.g. for Agno builds or CLI --help) does not pay for loading it.
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    # Use the libyaml-backed dumper when PyYAML was built with it
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    yaml.dump(data, stream, Dumper=dumper, default_flow_style=False, sort_keys=False)
+
+
 class FastAgentFramework(BaseFramework):
     """Framework implementation for Fast-Agent."""
 
@@ -23,21 +35,19 @@ class FastAgentFramework(BaseFramework):
             "",
         ])
 
+        default_model = self.config.default_model
+
         # Agent definitions
-        for agent in self.config.agents.values():
-            lines.append(agent.to_decorator_string(self.config.default_model))
+        lines.extend([agent.to_decorator_string(default_model) for agent in self.config.agents.values()])
 
         # Router definitions
-        for router in self.config.routers.values():
-            lines.append(router.to_decorator_string(self.config.default_model))
+        lines.extend([router.to_decorator_string(default_model) for router in self.config.routers.values()])
 
         # Chain definitions
-        for chain in self.config.chains.values():
-            lines.append(chain.to_decorator_string())
+        lines.extend([chain.to_decorator_string() for chain in self.config.chains.values()])
 
         # Orchestrator definitions
-        for orchestrator in self.config.orchestrators.values():
-            lines.append(orchestrator.to_decorator_string(self.config.default_model))
+        lines.extend([orch.to_decorator_string(default_model) for orch in self.config.orchestrators.values()])
 
         # Main function
         lines.extend([
@@ -121,7 +131,7 @@ class FastAgentFramework(BaseFramework):
 
         config_file = self.output_dir / "fastagent.config.yaml"
         with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(config_data, f, default_flow_style=False, sort_keys=False)
+            _dump_yaml(config_data, f)
 
     def _generate_secrets_yaml(self):
         """Generate the fastagent.secrets.yaml template file."""
@@ -152,7 +162,7 @@ class FastAgentFramework(BaseFramework):
                 "# Alternatively set OPENAI_API_KEY and ANTHROPIC_API_KEY "
                 "environment variables. Config file takes precedence.\n\n"
             )
-            yaml.dump(secrets_data, f, default_flow_style=False, sort_keys=False)
+            _dump_yaml(secrets_data, f)
 
     def _process_simple_secret(self, secret: str, secrets_data: dict, mcp_servers_env: dict):
         """Process a simple secret reference."""
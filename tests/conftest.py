@@ -0,0 +1,51 @@
+"""
+Shared pytest configuration for the agentman test suite.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """Register agentman-specific command line options."""
+    parser.addoption(
+        "--no-io",
+        action="store_true",
+        default=False,
+        help="skip tests marked with 'io' that read or write files on disk",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip disk-touching tests when --no-io is given."""
+    if not config.getoption("--no-io"):
+        return
+
+    skip_io = pytest.mark.skip(reason="disk I/O tests disabled with --no-io")
+    for item in items:
+        if "io" in item.keywords:
+            item.add_marker(skip_io)
+
+
+@pytest.fixture(scope="module")
+def fast_tmp(request, tmp_path_factory):
+    """Provide a scratch directory shared by a test module, on tmpfs when available.
+
+    The base directory is AGENTMAN_TEST_TMP if set, otherwise /dev/shm. If that
+    directory does not exist, or --basetemp is given, pytest's own temporary
+    directory is used instead so the files stay there for inspection. Tests
+    should work in their own subdirectory; a tmpfs tree is removed once after
+    the module finishes.
+    """
+    base = os.environ.get("AGENTMAN_TEST_TMP") or "/dev/shm"
+    if request.config.getoption("basetemp") is not None or not os.path.isdir(base):
+        yield tmp_path_factory.mktemp("fast_tmp")
+        return
+
+    path = Path(tempfile.mkdtemp(prefix="agentman-test-", dir=base))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
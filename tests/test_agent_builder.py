@@ -52,6 +52,7 @@ class TestAgentBuilder:
         assert builder.config == self.config
         assert builder.output_dir == Path("custom_output")
 
+    @pytest.mark.io
     def test_ensure_output_dir(self):
         """Test output directory creation."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -148,6 +149,7 @@ class TestAgentBuilder:
         assert "@fast.orchestrator" in content
         assert "test_orchestrator" in content
 
+    @pytest.mark.io
     def test_generate_config_yaml_basic(self):
         """Test basic config YAML generation."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -164,6 +166,7 @@ class TestAgentBuilder:
             assert "logger" in config_data
             assert config_data["logger"]["level"] == "info"
 
+    @pytest.mark.io
     def test_generate_config_yaml_with_servers(self):
         """Test config YAML generation with MCP servers."""
         # Add a server to the config
@@ -185,6 +188,7 @@ class TestAgentBuilder:
             assert "servers" in config_data["mcp"]
             assert "test_server" in config_data["mcp"]["servers"]
 
+    @pytest.mark.io
     def test_generate_secrets_yaml_simple(self):
         """Test secrets YAML generation with simple secrets."""
         self.config.secrets = ["OPENAI_API_KEY", "ANTHROPIC_API_KEY"]
@@ -209,6 +213,7 @@ class TestAgentBuilder:
                     assert "openai" in secrets_data
                     assert "anthropic" in secrets_data
 
+    @pytest.mark.io
     def test_generate_secrets_yaml_with_values(self):
         """Test secrets YAML generation with secret values."""
         secret_value = SecretValue("TEST_KEY", "test_value")
@@ -221,6 +226,7 @@ class TestAgentBuilder:
             secrets_file = Path(temp_dir) / "fastagent.secrets.yaml"
             assert secrets_file.exists()
 
+    @pytest.mark.io
     def test_generate_secrets_yaml_with_context(self):
         """Test secrets YAML generation with secret context."""
         secret_context = SecretContext("GENERIC")
@@ -242,6 +248,7 @@ class TestAgentBuilder:
     # Note: _process_* methods are now internal to framework handlers
     # and tested through integration tests
 
+    @pytest.mark.io
     def test_generate_dockerfile_custom_base(self):
         """Test Dockerfile generation with custom base image."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -258,6 +265,7 @@ class TestAgentBuilder:
             assert "WORKDIR /app" in content
             assert 'CMD ["python", "agent.py"]' in content
 
+    @pytest.mark.io
     def test_generate_dockerfile_with_expose(self):
         """Test Dockerfile generation with exposed ports."""
         self.config.expose_ports = [8000, 8080]
@@ -273,6 +281,7 @@ class TestAgentBuilder:
             assert "EXPOSE 8000" in content
             assert "EXPOSE 8080" in content
 
+    @pytest.mark.io
     def test_generate_dockerfile_fast_agent_base(self):
         """Test Dockerfile generation with yeahdongcn/agentman-base:latest base."""
         self.config.base_image = "yeahdongcn/agentman-base:latest"
@@ -289,6 +298,7 @@ class TestAgentBuilder:
             assert "COPY agent.py" in content
             assert "RUN pip install" in content
 
+    @pytest.mark.io
     def test_generate_requirements_txt_basic(self):
         """Test basic requirements.txt generation."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -304,6 +314,7 @@ class TestAgentBuilder:
             assert "fast-agent-mcp" in content
             assert "deprecated" in content
 
+    @pytest.mark.io
     def test_generate_requirements_txt_with_servers(self):
         """Test requirements.txt generation with server dependencies."""
         # Add servers that require additional packages
@@ -324,6 +335,7 @@ class TestAgentBuilder:
             assert "requests" not in content
             assert "psycopg2-binary" not in content
 
+    @pytest.mark.io
     def test_generate_dockerignore(self):
         """Test .dockerignore generation."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -341,6 +353,7 @@ class TestAgentBuilder:
             assert ".git/" in content
             assert ".DS_Store" in content
 
+    @pytest.mark.io
     def test_generate_python_agent_file_creation(self):
         """Test that Python agent file is created."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -356,6 +369,7 @@ class TestAgentBuilder:
             assert "import asyncio" in content
             assert "FastAgent" in content
 
+    @pytest.mark.io
     def test_build_all(self):
         """Test building all files at once."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -376,6 +390,7 @@ class TestAgentBuilder:
                 file_path = Path(temp_dir) / filename
                 assert file_path.exists(), f"File {filename} was not created"
 
+    @pytest.mark.io
     @patch('agentman.agent_builder.AgentfileParser')
     def test_build_from_agentfile(self, mock_parser_class):
         """Test building from Agentfile function."""
@@ -418,6 +433,7 @@ class TestAgentBuilder:
                 # Verify the builder was created with default output
                 mock_build_all.assert_called_once()
 
+    @pytest.mark.io
     def test_complex_configuration(self):
         """Test builder with complex configuration including all components."""
         # Set up complex configuration
@@ -472,6 +488,7 @@ class TestAgentBuilder:
 class TestAgentBuilderEdgeCases:
     """Test edge cases and error conditions for AgentBuilder."""
 
+    @pytest.mark.io
     def test_empty_config(self):
         """Test builder with minimal empty configuration."""
         config = AgentfileConfig()
@@ -495,6 +512,7 @@ class TestAgentBuilderEdgeCases:
                 file_path = Path(temp_dir) / filename
                 assert file_path.exists()
 
+    @pytest.mark.io
     def test_no_default_model(self):
         """Test builder behavior when no default model is specified."""
         config = AgentfileConfig()
@@ -512,6 +530,7 @@ class TestAgentBuilderEdgeCases:
             # Should default to "haiku"
             assert config_data["default_model"] == "haiku"
 
+    @pytest.mark.io
     def test_server_with_env_variables(self):
         """Test server configuration with environment variables."""
         config = AgentfileConfig()
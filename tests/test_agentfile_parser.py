@@ -11,9 +11,12 @@ Tests cover all aspects of the AgentfileParser including:
 - Error handling and validation
 """
 
+import dataclasses
+import functools
+import io
+from unittest.mock import patch
+
 import pytest
-import tempfile
-import os
 
 from agentman.agentfile_parser import (
     AgentfileParser,
@@ -23,109 +26,202 @@ from agentman.agentfile_parser import (
     Router,
     Chain,
     Orchestrator,
+    DockerfileInstruction,
     SecretValue,
-    SecretContext
+    SecretContext,
 )
 
+_CONTENT_SERVER = """
+FROM python:3.11-slim
+SERVER filesystem
+    COMMAND uv
+    ARGS tool run mcp-server-filesystem /tmp
+    TRANSPORT stdio
+""".strip()
 
-class TestAgentfileParser:
-    """Test suite for AgentfileParser class."""
-
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.parser = AgentfileParser()
-
-    def test_init(self):
-        """Test parser initialization."""
-        assert self.parser.config is not None
-        assert isinstance(self.parser.config, AgentfileConfig)
-        assert self.parser.config.base_image == "yeahdongcn/agentman-base:latest"
-        assert self.parser.config.secrets == []
-        assert self.parser.config.servers == {}
-        assert self.parser.config.agents == {}
-
-    def test_parse_content_basic(self):
-        """Test parsing basic Agentfile content."""
-        content = """
+_CONTENT_FILE = """
 FROM python:3.11-slim
 MODEL anthropic/claude-3-sonnet-20241022
 EXPOSE 8080
-CMD ["agentman", "run"]
-"""
-        config = self.parser.parse_content(content)
+""".strip()
 
-        assert config.base_image == "python:3.11-slim"
-        assert config.default_model == "anthropic/claude-3-sonnet-20241022"
-        assert config.expose_ports == [8080]
-        assert config.cmd == ["agentman", "run"]
+_CONTENT_SECRET_CONTEXTS = """
+FROM yeahdongcn/agentman-base:latest
+MODEL generic.qwen3:latest
 
-    def test_parse_content_with_secrets(self):
-        """Test parsing content with secrets."""
-        content = """
-        FROM my-base-image
-        MODEL gpt-4
-        SECRET my_secret
-        """
-        config = self.parser.parse_content(content)
-        assert config.base_image == "my-base-image"
-        assert config.default_model == "gpt-4"
-        assert len(config.secrets) == 1
+SECRET openai
+API_KEY sk-test123
+BASE_URL https://api.openai.com/v1
 
-    def test_parse_content_with_server(self):
-        """Test parsing Agentfile with server definition."""
-        content = """
+SECRET anthropic
+API_KEY claude-key
+""".strip()
+
+_CONTENT_RUN_SINGLE_LINE = """
 FROM python:3.11-slim
-SERVER filesystem
-    COMMAND uv
-    ARGS tool run mcp-server-filesystem /tmp
-    TRANSPORT stdio
-"""
-        config = self.parser.parse_content(content)
+RUN apt-get update
+""".strip()
 
-        assert len(config.servers) == 1
-        assert "filesystem" in config.servers
-        server = config.servers["filesystem"]
-        assert server.name == "filesystem"
-        assert server.command == "uv"
-        assert server.args == ["tool", "run", "mcp-server-filesystem", "/tmp"]
-        assert server.transport == "stdio"
-
-    def test_parse_file(self):
-        """Test parsing Agentfile from file."""
-        content = """
+_CONTENT_RUN_MULTILINE = """
 FROM python:3.11-slim
-MODEL anthropic/claude-3-sonnet-20241022
+RUN apt-get update && apt-get install -y \\
+    wget \\
+    curl \\
+    && rm -rf /var/lib/apt/lists/*
+""".strip()
+
+_CONTENT_RUN_COMPLEX_MULTILINE = """
+FROM yeahdongcn/agentman-base:latest
+RUN apt-get update && apt-get install -y \\
+    wget \\
+    && rm -rf /var/lib/apt/lists/*
+""".strip()
+
+_CONTENT_DOCKERFILE_INSTRUCTIONS = """
+FROM python:3.11-slim
+WORKDIR /app
+RUN apt-get update
+COPY . .
+RUN pip install -r requirements.txt
 EXPOSE 8080
-"""
+CMD ["python", "app.py"]
+""".strip()
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.agentfile', delete=False) as f:
-            f.write(content)
-            f.flush()
+_CONTENT_UNKNOWN_INSTRUCTION = """
+FROM python:3.11-slim
+UNKNOWN INSTRUCTION args
+""".strip()
 
-            try:
-                config = self.parser.parse_file(f.name)
-                assert config.base_image == "python:3.11-slim"
-                assert config.default_model == "anthropic/claude-3-sonnet-20241022"
-                assert config.expose_ports == [8080]
-            finally:
-                os.unlink(f.name)
+_CONTENT_DUPLICATE_SECRET = """
+FROM yeahdongcn/agentman-base:latest
 
-    def test_parse_file_not_exists(self):
-        """Test parsing from non-existent file raises error."""
-        with pytest.raises(FileNotFoundError):
-            self.parser.parse_file("/non/existent/file")
+SECRET my_secret
+API_KEY sk-test123
+
+SECRET my_secret
+BASE_URL https://api.openai.com/v1
+""".strip()
+
+_CONTENT_ENV_SERVER = """
+FROM yeahdongcn/agentman-base:latest
+
+SERVER github-mcp-server
+COMMAND /server/github-mcp-server
+ARGS stdio
+ENV GITHUB_PERSONAL_ACCESS_TOKEN=ABC123
+ENV API_BASE_URL=https://api.github.com/v1
+TRANSPORT stdio
+""".strip()
+
+_CONTENT_ENV_DOCKERFILE = """
+FROM yeahdongcn/agentman-base:latest
+ENV SSL_CERT_FILE=/etc/ssl/certs/ca-certificates.crt
+ENV PYTHON_PATH=/usr/local/lib/python3.9
+WORKDIR /app
+""".strip()
+
+_CONTENT_ENV_MIXED_SERVER = """
+FROM yeahdongcn/agentman-base:latest
+
+SERVER mixed-server
+COMMAND /server/mixed-server
+ENV TOKEN abc123
+ENV API_URL=https://api.example.com
+ENV DEBUG true
+TRANSPORT stdio
+""".strip()
+
+_CONTENT_MULTILINE_INSTRUCTION = """
+FROM yeahdongcn/agentman-base:latest
+
+AGENT github-release-checker
+INSTRUCTION Given a GitHub repository URL, find the latest **official release** of the repository. \\
+            An official release is one that is explicitly marked as **"Latest"** and **not** marked as a **"Pre-release"**. \\
+            If you encounter a release marked as **Pre-release**, do **not** stop or return it. \\
+            Instead, continue checking additional releases until you find the most recent release that meets the criteria.
+SERVERS fetch github-mcp-server
+""".strip()
+
+_CONTENT_MULTILINE_INSTRUCTION_COMPLEX = """
+FROM yeahdongcn/agentman-base:latest
+
+AGENT complex-agent
+INSTRUCTION This is a very long instruction that spans multiple lines \\
+            and contains detailed explanations about what the agent should do. \\
+            It includes specific requirements, formatting instructions, \\
+            and examples of the expected output format. \\
+            The agent should handle edge cases gracefully \\
+            and provide comprehensive responses.
+SERVERS server1 server2
+""".strip()
 
-    def test_empty_agentfile(self):
-        """Test parsing empty Agentfile."""
-        config = self.parser.parse_content("")
-        assert config.base_image == "yeahdongcn/agentman-base:latest"
-        assert len(config.secrets) == 0
-        assert len(config.servers) == 0
-        assert len(config.agents) == 0
 
-    def test_comments_and_whitespace(self):
-        """Test parsing with comments and extra whitespace."""
-        content = """
+def _find_instruction(instructions, instruction_type):
+    """Return the first instruction of the given type, or None."""
+    for instruction in instructions:
+        if instruction.instruction == instruction_type:
+            return instruction
+    return None
+
+
+def _index_instructions(instructions):
+    """Group instructions by type, preserving their order within each type."""
+    index = {}
+    for instruction in instructions:
+        index.setdefault(instruction.instruction, []).append(instruction)
+    return index
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_cached(content):
+    """Parse content once per distinct string; callers must not mutate the result."""
+    return AgentfileParser().parse_content(content)
+
+
+# Happy-path parse_content cases: (content, expected config attributes).
+# Content is passed as written, including indentation and surrounding blank
+# lines, which the 'secrets' and 'comments-and-whitespace' cases rely on.
+PARSE_CONTENT_CASES = [
+    pytest.param(
+        """
+FROM python:3.11-slim
+MODEL anthropic/claude-3-sonnet-20241022
+EXPOSE 8080
+CMD ["agentman", "run"]
+""",
+        {
+            "base_image": "python:3.11-slim",
+            "default_model": "anthropic/claude-3-sonnet-20241022",
+            "expose_ports": [8080],
+            "cmd": ["agentman", "run"],
+        },
+        id="basic",
+    ),
+    pytest.param(
+        """
+        FROM my-base-image
+        MODEL gpt-4
+        SECRET my_secret
+        """,
+        {
+            "base_image": "my-base-image",
+            "default_model": "gpt-4",
+            "secrets": [SecretContext(name="my_secret")],
+        },
+        id="secrets",
+    ),
+    pytest.param(
+        "",
+        {
+            "base_image": "yeahdongcn/agentman-base:latest",
+            "secrets": [],
+            "servers": {},
+            "agents": {},
+        },
+        id="empty",
+    ),
+    pytest.param(
+        """
 # This is a comment
 FROM python:3.11-slim
 
@@ -135,98 +231,188 @@ MODEL anthropic/claude-3-sonnet-20241022
     # Indented comment
 EXPOSE 8080
 
-"""
-        config = self.parser.parse_content(content)
+""",
+        {
+            "base_image": "python:3.11-slim",
+            "default_model": "anthropic/claude-3-sonnet-20241022",
+            "expose_ports": [8080],
+        },
+        id="comments-and-whitespace",
+    ),
+    pytest.param(
+        'CMD ["sh", "-c", "echo a, b"]',
+        {"cmd": ["sh", "-c", "echo a, b"]},
+        id="cmd-exec-form-with-comma",
+    ),
+    pytest.param(
+        "CMD ['python', 'agent.py']",
+        {"cmd": ["python", "agent.py"]},
+        id="cmd-single-quoted-array",
+    ),
+    pytest.param(
+        "EXPOSE 8080 9090\nEXPOSE 8080",
+        {"expose_ports": [8080, 9090]},
+        id="expose-multiple-ports",
+    ),
+    # FROM is not strictly required
+    pytest.param(
+        """
+MODEL anthropic/claude-3-sonnet-20241022
+EXPOSE 8080
+""",
+        {
+            "default_model": "anthropic/claude-3-sonnet-20241022",
+            "expose_ports": [8080],
+            "dockerfile_instructions": [DockerfileInstruction(instruction="EXPOSE", args=["8080"])],
+        },
+        id="without-from",
+    ),
+]
+
+
+# Invalid content: (content, pattern expected in the ValueError message)
+PARSE_ERROR_CASES = [
+    pytest.param("FRAMEWORK invalid-framework", "Unsupported framework", id="invalid-framework"),
+    pytest.param("FROM", "FROM requires a base image", id="missing-base-image"),
+    pytest.param("SERVER", "SERVER requires a server name", id="missing-server-name"),
+    pytest.param("AGENT", "AGENT requires an agent name", id="missing-agent-name"),
+    pytest.param("SECRET", "SECRET requires a secret name", id="missing-secret-name"),
+    pytest.param("EXPOSE abc", "Invalid port number: abc", id="invalid-port"),
+    pytest.param("CMD", "CMD requires at least one argument", id="missing-cmd"),
+    pytest.param("COMMAND uv", "can only be used within a context", id="sub-instruction-without-context"),
+    pytest.param("SERVER s\nTRANSPORT ftp", "(?s)line 2: .*Invalid transport type: ftp", id="invalid-transport"),
+    pytest.param("ORCHESTRATOR o\nPLAN_TYPE x", "Invalid plan type: x", id="invalid-plan-type"),
+    pytest.param(
+        "ORCHESTRATOR o\nPLAN_ITERATIONS x",
+        "Invalid number for PLAN_ITERATIONS",
+        id="invalid-plan-iterations",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def shared_parser():
+    """Provide a single AgentfileParser for the whole module."""
+    return AgentfileParser()
+
+
+@pytest.fixture
+def parser(shared_parser):
+    """Provide the shared parser, resetting it after each test."""
+    yield shared_parser
+    shared_parser.reset()
+
+
+class TestAgentfileParser:
+    """Test suite for AgentfileParser class."""
+
+    def test_init(self, parser):
+        """Test parser initialization."""
+        assert parser.config is not None
+        assert isinstance(parser.config, AgentfileConfig)
+        assert parser.config.base_image == "yeahdongcn/agentman-base:latest"
+        assert parser.config.secrets == []
+        assert parser.config.servers == {}
+        assert parser.config.agents == {}
+
+    def test_reset(self, parser):
+        """Test that reset discards previously parsed state."""
+        parser.parse_content("FROM python:3.11-slim\nEXPOSE 8080\nSECRET my_secret")
+        parser.reset()
+
+        assert parser.config == AgentfileConfig()
+        assert parser.current_context is None
+        assert parser.current_item is None
+        assert parser.parse_content("EXPOSE 8080").expose_ports == [8080]
+
+    @pytest.mark.parametrize("content,expected", PARSE_CONTENT_CASES)
+    def test_parse_content(self, content, expected):
+        """Test parsing Agentfile content into the expected configuration."""
+        config = _parse_cached(content)
+
+        for attr, value in expected.items():
+            assert getattr(config, attr) == value, attr
+
+    @pytest.mark.parametrize("content,match", PARSE_ERROR_CASES)
+    def test_parse_content_errors(self, parser, content, match):
+        """Test that invalid content raises ValueError with a descriptive message."""
+        with pytest.raises(ValueError, match=match):
+            parser.parse_content(content)
+
+    def test_parse_content_with_server(self):
+        """Test parsing Agentfile with server definition."""
+        config = _parse_cached(_CONTENT_SERVER)
+
+        assert config.servers == {
+            "filesystem": MCPServer(
+                name="filesystem",
+                command="uv",
+                args=["tool", "run", "mcp-server-filesystem", "/tmp"],
+                transport="stdio",
+            )
+        }
+
+    @pytest.mark.io
+    def test_parse_file(self, parser, tmp_path):
+        """Test parsing Agentfile from file."""
+        agentfile = tmp_path / "x.agentfile"
+        agentfile.write_text(_CONTENT_FILE)
+
+        config = parser.parse_file(str(agentfile))
         assert config.base_image == "python:3.11-slim"
         assert config.default_model == "anthropic/claude-3-sonnet-20241022"
         assert config.expose_ports == [8080]
 
+    def test_parse_file_from_stream(self, parser):
+        """Test parsing an Agentfile from an open text stream."""
+        stream = io.StringIO(_CONTENT_FILE)
+
+        config = parser.parse_file(stream)
+        assert config.base_image == "python:3.11-slim"
+        assert config.default_model == "anthropic/claude-3-sonnet-20241022"
+        assert config.expose_ports == [8080]
+        assert not stream.closed
+
+    def test_parse_file_not_exists(self, parser):
+        """Test parsing from non-existent file raises error."""
+        with patch("builtins.open", side_effect=FileNotFoundError):
+            with pytest.raises(FileNotFoundError):
+                parser.parse_file("/non/existent/file")
+
     def test_parse_content_with_secret_context_arbitrary_name(self):
         """Test parsing secret context with arbitrary names like 'openai'."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-MODEL generic.qwen3:latest
+        config = _parse_cached(_CONTENT_SECRET_CONTEXTS)
 
-SECRET openai
-API_KEY sk-test123
-BASE_URL https://api.openai.com/v1
-
-SECRET anthropic
-API_KEY claude-key
-"""
-        config = self.parser.parse_content(content)
-
-        assert len(config.secrets) == 2
-
-        # Find openai secret context
-        openai_secret = None
-        anthropic_secret = None
-        for secret in config.secrets:
-            if isinstance(secret, SecretContext):
-                if secret.name == "openai":
-                    openai_secret = secret
-                elif secret.name == "anthropic":
-                    anthropic_secret = secret
-
-        assert openai_secret is not None
-        assert anthropic_secret is not None
-
-        # Check openai secret values
-        assert openai_secret.values["API_KEY"] == "sk-test123"
-        assert openai_secret.values["BASE_URL"] == "https://api.openai.com/v1"
-
-        # Check anthropic secret values
-        assert anthropic_secret.values["API_KEY"] == "claude-key"
-
-    def _find_instruction_by_type(self, instructions, instruction_type):
-        """Helper function to find instruction by type."""
-        return next(
-            (
-                instruction
-                for instruction in instructions
-                if instruction.instruction == instruction_type
-            ),
-            None,
-        )
+        assert config.secrets == [
+            SecretContext(name="openai", values={"API_KEY": "sk-test123", "BASE_URL": "https://api.openai.com/v1"}),
+            SecretContext(name="anthropic", values={"API_KEY": "claude-key"}),
+        ]
 
     def test_parse_run_instruction_single_line(self):
         """Test parsing single-line RUN instruction."""
-        content = """
-FROM python:3.11-slim
-RUN apt-get update
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_RUN_SINGLE_LINE)
 
         assert config.base_image == "python:3.11-slim"
         assert len(config.dockerfile_instructions) == 2  # FROM and RUN
 
         # Find the RUN instruction
-        run_instruction = self._find_instruction_by_type(config.dockerfile_instructions, "RUN")
-
-        assert run_instruction is not None
-        assert run_instruction.instruction == "RUN"
+        run_instructions = _index_instructions(config.dockerfile_instructions)["RUN"]
+        assert len(run_instructions) == 1
+        run_instruction = run_instructions[0]
         assert run_instruction.args == ["apt-get", "update"]
         assert run_instruction.to_dockerfile_line() == "RUN apt-get update"
 
     def test_parse_run_instruction_multiline(self):
         """Test parsing multi-line RUN instruction with backslash continuation."""
-        content = """
-FROM python:3.11-slim
-RUN apt-get update && apt-get install -y \\
-    wget \\
-    curl \\
-    && rm -rf /var/lib/apt/lists/*
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_RUN_MULTILINE)
 
         assert config.base_image == "python:3.11-slim"
         assert len(config.dockerfile_instructions) == 2  # FROM and RUN
 
         # Find the RUN instruction
-        run_instruction = self._find_instruction_by_type(config.dockerfile_instructions, "RUN")
-
-        assert run_instruction is not None
-        assert run_instruction.instruction == "RUN"
+        run_instructions = _index_instructions(config.dockerfile_instructions)["RUN"]
+        assert len(run_instructions) == 1
+        run_instruction = run_instructions[0]
 
         # The multi-line command should be combined into a single line
         expected_command = "apt-get update && apt-get install -y wget curl && rm -rf /var/lib/apt/lists/*"
@@ -239,47 +425,24 @@ RUN apt-get update && apt-get install -y \\
 
     def test_parse_run_instruction_complex_multiline(self):
         """Test parsing complex multi-line RUN instruction like the one in the Agentfile."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-RUN apt-get update && apt-get install -y \\
-    wget \\
-    && rm -rf /var/lib/apt/lists/*
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_RUN_COMPLEX_MULTILINE)
 
         assert config.base_image == "yeahdongcn/agentman-base:latest"
         assert len(config.dockerfile_instructions) == 2  # FROM and RUN
 
         # Find the RUN instruction
-        run_instruction = self._find_instruction_by_type(config.dockerfile_instructions, "RUN")
-
-        assert run_instruction is not None
-        assert run_instruction.instruction == "RUN"
+        run_instructions = _index_instructions(config.dockerfile_instructions)["RUN"]
+        assert len(run_instructions) == 1
+        run_instruction = run_instructions[0]
 
         # The multi-line command should be combined correctly
         expected_command = "apt-get update && apt-get install -y wget && rm -rf /var/lib/apt/lists/*"
         actual_command = " ".join(run_instruction.args)
         assert actual_command == expected_command
 
-    def _validate_instruction(self, instructions, index, expected_instruction, expected_args):
-        """Helper function to validate a specific instruction."""
-        actual = instructions[index]
-        assert actual.instruction == expected_instruction
-        if expected_instruction != "CMD":  # CMD has special handling
-            assert actual.args == expected_args
-
     def test_parse_multiple_dockerfile_instructions(self):
         """Test parsing multiple Dockerfile instructions with RUN."""
-        content = """
-FROM python:3.11-slim
-WORKDIR /app
-RUN apt-get update
-COPY . .
-RUN pip install -r requirements.txt
-EXPOSE 8080
-CMD ["python", "app.py"]
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_DOCKERFILE_INSTRUCTIONS)
 
         assert config.base_image == "python:3.11-slim"
         assert config.expose_ports == [8080]
@@ -296,54 +459,25 @@ CMD ["python", "app.py"]
             ("CMD", ["python", "app.py"])
         ]
 
-        assert len(config.dockerfile_instructions) == len(expected_instructions)
-
-        # Validate each instruction using helper
-        for i, (expected_instruction, expected_args) in enumerate(expected_instructions):
-            self._validate_instruction(config.dockerfile_instructions, i, expected_instruction, expected_args)
+        actual_instructions = [(i.instruction, i.args) for i in config.dockerfile_instructions]
+        assert actual_instructions == expected_instructions
 
     def test_parse_content_with_unknown_instruction(self):
         """Test parsing content with an unknown instruction (should be treated as Dockerfile instruction)."""
-        content = """
-FROM python:3.11-slim
-UNKNOWN INSTRUCTION args
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_UNKNOWN_INSTRUCTION)
 
         # Unknown instructions should be treated as Dockerfile instructions
         assert len(config.dockerfile_instructions) == 2  # FROM and UNKNOWN
 
-        unknown_instruction = self._find_instruction_by_type(config.dockerfile_instructions, "UNKNOWN")
+        unknown_instruction = _find_instruction(config.dockerfile_instructions, "UNKNOWN")
 
         assert unknown_instruction is not None
         assert unknown_instruction.instruction == "UNKNOWN"
         assert unknown_instruction.args == ["INSTRUCTION", "args"]
 
-    def test_parse_content_without_from_instruction(self):
-        """Test parsing content without FROM instruction (should still work)."""
-        content = """
-MODEL anthropic/claude-3-sonnet-20241022
-EXPOSE 8080
-"""
-        config = self.parser.parse_content(content)
-
-        # Should not raise an error - FROM is not strictly required anymore
-        assert config.default_model == "anthropic/claude-3-sonnet-20241022"
-        assert config.expose_ports == [8080]
-        assert len(config.dockerfile_instructions) == 1  # EXPOSE
-
     def test_parse_content_with_duplicate_secret(self):
         """Test parsing content with duplicate secret definitions."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-
-SECRET my_secret
-API_KEY sk-test123
-
-SECRET my_secret
-BASE_URL https://api.openai.com/v1
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_DUPLICATE_SECRET)
 
         assert len(config.secrets) == 1  # Only one secret should be created
         secret = config.secrets[0]
@@ -353,46 +487,30 @@ BASE_URL https://api.openai.com/v1
 
     def test_env_key_value_syntax_server_context(self):
         """Test parsing ENV KEY=VALUE syntax in SERVER context."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-
-SERVER github-mcp-server
-COMMAND /server/github-mcp-server
-ARGS stdio
-ENV GITHUB_PERSONAL_ACCESS_TOKEN=ABC123
-ENV API_BASE_URL=https://api.github.com/v1
-TRANSPORT stdio
-"""
-        config = self.parser.parse_content(content)
-
-        assert len(config.servers) == 1
-        assert "github-mcp-server" in config.servers
-        server = config.servers["github-mcp-server"]
-        assert server.name == "github-mcp-server"
-        assert server.command == "/server/github-mcp-server"
-        assert server.args == ["stdio"]
-        assert server.transport == "stdio"
-
-        # Check that environment variables are properly parsed
-        assert len(server.env) == 2
-        assert server.env["GITHUB_PERSONAL_ACCESS_TOKEN"] == "ABC123"
-        assert server.env["API_BASE_URL"] == "https://api.github.com/v1"
+        config = _parse_cached(_CONTENT_ENV_SERVER)
+
+        assert config.servers == {
+            "github-mcp-server": MCPServer(
+                name="github-mcp-server",
+                command="/server/github-mcp-server",
+                args=["stdio"],
+                transport="stdio",
+                env={
+                    "GITHUB_PERSONAL_ACCESS_TOKEN": "ABC123",
+                    "API_BASE_URL": "https://api.github.com/v1",
+                },
+            )
+        }
 
     def test_env_key_value_syntax_dockerfile_context(self):
         """Test parsing ENV KEY=VALUE syntax as Dockerfile instruction."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-ENV SSL_CERT_FILE=/etc/ssl/certs/ca-certificates.crt
-ENV PYTHON_PATH=/usr/local/lib/python3.9
-WORKDIR /app
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_ENV_DOCKERFILE)
 
         assert config.base_image == "yeahdongcn/agentman-base:latest"
         assert len(config.dockerfile_instructions) == 4  # FROM, ENV, ENV, WORKDIR
 
         # Find the ENV instructions
-        env_instructions = [instr for instr in config.dockerfile_instructions if instr.instruction == "ENV"]
+        env_instructions = _index_instructions(config.dockerfile_instructions)["ENV"]
         assert len(env_instructions) == 2
 
         # Check first ENV instruction
@@ -407,40 +525,21 @@ WORKDIR /app
 
     def test_env_mixed_syntax_server_context(self):
         """Test parsing mixed ENV syntax (KEY VALUE and KEY=VALUE) in SERVER context."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-
-SERVER mixed-server
-COMMAND /server/mixed-server
-ENV TOKEN abc123
-ENV API_URL=https://api.example.com
-ENV DEBUG true
-TRANSPORT stdio
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_ENV_MIXED_SERVER)
 
         assert len(config.servers) == 1
         server = config.servers["mixed-server"]
 
         # Check that both syntax formats work
-        assert len(server.env) == 3
-        assert server.env["TOKEN"] == "abc123"  # KEY VALUE format
-        assert server.env["API_URL"] == "https://api.example.com"  # KEY=VALUE format
-        assert server.env["DEBUG"] == "true"  # KEY VALUE format
+        assert server.env == {
+            "TOKEN": "abc123",  # KEY VALUE format
+            "API_URL": "https://api.example.com",  # KEY=VALUE format
+            "DEBUG": "true",  # KEY VALUE format
+        }
 
     def test_multiline_instruction_syntax(self):
         """Test parsing multiline INSTRUCTION with backslash continuation."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-
-AGENT github-release-checker
-INSTRUCTION Given a GitHub repository URL, find the latest **official release** of the repository. \\
-            An official release is one that is explicitly marked as **"Latest"** and **not** marked as a **"Pre-release"**. \\
-            If you encounter a release marked as **Pre-release**, do **not** stop or return it. \\
-            Instead, continue checking additional releases until you find the most recent release that meets the criteria.
-SERVERS fetch github-mcp-server
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_MULTILINE_INSTRUCTION)
 
         assert len(config.agents) == 1
         assert "github-release-checker" in config.agents
@@ -457,19 +556,7 @@ SERVERS fetch github-mcp-server
 
     def test_multiline_instruction_complex_syntax(self):
         """Test parsing complex multiline INSTRUCTION with multiple continuation lines."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-
-AGENT complex-agent
-INSTRUCTION This is a very long instruction that spans multiple lines \\
-            and contains detailed explanations about what the agent should do. \\
-            It includes specific requirements, formatting instructions, \\
-            and examples of the expected output format. \\
-            The agent should handle edge cases gracefully \\
-            and provide comprehensive responses.
-SERVERS server1 server2
-"""
-        config = self.parser.parse_content(content)
+        config = _parse_cached(_CONTENT_MULTILINE_INSTRUCTION_COMPLEX)
 
         assert len(config.agents) == 1
         agent = config.agents["complex-agent"]
@@ -498,12 +585,14 @@ class TestDataClasses:
             url="http://localhost",
             env={"KEY": "value"}
         )
-        assert server.name == "test"
-        assert server.command == "uv"
-        assert server.args == ["tool", "run"]
-        assert server.transport == "stdio"
-        assert server.url == "http://localhost"
-        assert server.env == {"KEY": "value"}
+        assert dataclasses.asdict(server) == {
+            "name": "test",
+            "command": "uv",
+            "args": ["tool", "run"],
+            "transport": "stdio",
+            "url": "http://localhost",
+            "env": {"KEY": "value"},
+        }
 
     def test_agent_creation(self):
         """Test Agent data class creation."""
@@ -516,13 +605,15 @@ class TestDataClasses:
             human_input=False,
             default=False,
         )
-        assert agent.name == "assistant"
-        assert agent.instruction == "You are helpful"
-        assert agent.servers == ["filesystem"]
-        assert agent.model == "anthropic/claude-3-sonnet-20241022"
-        assert agent.use_history is True
-        assert agent.human_input is False
-        assert agent.default is False
+        assert dataclasses.asdict(agent) == {
+            "name": "assistant",
+            "instruction": "You are helpful",
+            "servers": ["filesystem"],
+            "model": "anthropic/claude-3-sonnet-20241022",
+            "use_history": True,
+            "human_input": False,
+            "default": False,
+        }
 
     def test_secret_value_creation(self):
         """Test SecretValue data class creation."""
@@ -547,11 +638,13 @@ class TestDataClasses:
             model="anthropic/claude-3-sonnet-20241022",
             instruction="Route requests"
         )
-        assert router.name == "multi_agent"
-        assert router.agents == ["agent1", "agent2"]
-        assert router.model == "anthropic/claude-3-sonnet-20241022"
-        assert router.instruction == "Route requests"
-        assert router.default is False
+        assert dataclasses.asdict(router) == {
+            "name": "multi_agent",
+            "agents": ["agent1", "agent2"],
+            "model": "anthropic/claude-3-sonnet-20241022",
+            "instruction": "Route requests",
+            "default": False,
+        }
 
     def test_chain_creation(self):
         """Test Chain data class creation."""
@@ -560,10 +653,14 @@ class TestDataClasses:
             sequence=["agent1", "agent2"],
             instruction="Process sequentially"
         )
-        assert chain.name == "sequential"
-        assert chain.sequence == ["agent1", "agent2"]
-        assert chain.instruction == "Process sequentially"
-        assert chain.default is False
+        assert dataclasses.asdict(chain) == {
+            "name": "sequential",
+            "sequence": ["agent1", "agent2"],
+            "instruction": "Process sequentially",
+            "cumulative": False,
+            "continue_with_final": True,
+            "default": False,
+        }
 
     def test_orchestrator_creation(self):
         """Test Orchestrator data class creation."""
@@ -574,11 +671,16 @@ class TestDataClasses:
             instruction="Orchestrate agents",
             default=True,
         )
-        assert orchestrator.name == "complex"
-        assert orchestrator.agents == ["agent1", "agent2"]
-        assert orchestrator.model == "anthropic/claude-3-sonnet-20241022"
-        assert orchestrator.instruction == "Orchestrate agents"
-        assert orchestrator.default is True
+        assert dataclasses.asdict(orchestrator) == {
+            "name": "complex",
+            "agents": ["agent1", "agent2"],
+            "model": "anthropic/claude-3-sonnet-20241022",
+            "instruction": "Orchestrate agents",
+            "plan_type": "full",
+            "plan_iterations": 5,
+            "human_input": False,
+            "default": True,
+        }
 
     def test_agentfile_config_creation(self):
         """Test AgentfileConfig data class creation."""
@@ -1,115 +1,45 @@
 """Tests for framework support functionality."""
 
+import functools
 import pytest
+import yaml
 from src.agentman.agentfile_parser import AgentfileParser
 from src.agentman.agent_builder import AgentBuilder
-import tempfile
-from pathlib import Path
 
-
-class TestFrameworkSupport:
-    """Test framework detection and code generation."""
-
-    def test_framework_parsing_fast_agent_default(self):
-        """Test that FastAgent is the default framework."""
-        content = """
+# Single-agent Agentfiles shared by several tests
+_DEFAULT_FRAMEWORK_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 MODEL anthropic/claude-3-sonnet-20241022
 AGENT test
 INSTRUCTION Test agent
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-        assert config.framework == "fast-agent"
 
-    def test_framework_parsing_agno_explicit(self):
-        """Test parsing explicit Agno framework."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-FRAMEWORK agno
-MODEL anthropic/claude-3-sonnet-20241022
-AGENT test
-INSTRUCTION Test agent
-"""
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-        assert config.framework == "agno"
-
-    def test_framework_parsing_fast_agent_explicit(self):
-        """Test parsing explicit FastAgent framework."""
-        content = """
+_FAST_AGENT_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK fast-agent
 MODEL anthropic/claude-3-sonnet-20241022
 AGENT test
 INSTRUCTION Test agent
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-        assert config.framework == "fast-agent"
 
-    def test_framework_validation_invalid(self):
-        """Test that invalid framework raises error."""
-        content = """
+_AGNO_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
-FRAMEWORK invalid-framework
+FRAMEWORK agno
 MODEL anthropic/claude-3-sonnet-20241022
 AGENT test
 INSTRUCTION Test agent
 """
-        parser = AgentfileParser()
-        with pytest.raises(ValueError, match="Unsupported framework"):
-            parser.parse_content(content)
 
-    def test_fast_agent_code_generation(self):
-        """Test FastAgent code generation."""
-        content = """
+# Agentfiles specific to individual tests
+_INVALID_FRAMEWORK_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
-FRAMEWORK fast-agent
+FRAMEWORK invalid-framework
 MODEL anthropic/claude-3-sonnet-20241022
 AGENT test
 INSTRUCTION Test agent
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            code = builder.framework.build_agent_content()
 
-            assert "from mcp_agent.core.fastagent import FastAgent" in code
-            assert 'FastAgent("Generated by Agentman")' in code
-            assert "@fast.agent" in code
-            assert "async with fast.run() as agent:" in code
-
-    def test_agno_code_generation(self):
-        """Test Agno code generation."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-FRAMEWORK agno
-MODEL anthropic/claude-3-sonnet-20241022
-AGENT test
-INSTRUCTION Test agent
-"""
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            code = builder.framework.build_agent_content()
-
-            assert "from agno.agent import Agent" in code
-            assert "from agno.models.anthropic import Claude" in code
-            assert "from agno.tools.reasoning import ReasoningTools" in code
-            assert "Agent(" in code
-            assert "Claude(id=" in code
-            assert ".print_response(" in code
-            assert "show_full_reasoning=True" in code
-            assert "stream_intermediate_steps=True" in code
-
-    def test_agno_multi_agent_team_generation(self):
-        """Test Agno multi-agent team generation."""
-        content = """
+_AGNO_TEAM_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK agno
 MODEL anthropic/claude-3-sonnet-20241022
@@ -120,53 +50,8 @@ AGENT analyst
 INSTRUCTION Data analyst
 SERVERS finance
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            code = builder.framework.build_agent_content()
-
-            # Check for team imports
-            assert "from agno.team.team import Team" in code
-
-            # Check for multiple agents
-            assert "researcher_agent = Agent(" in code
-            assert "analyst_agent = Agent(" in code
-
-            # Check for team creation
-            assert "agentteam = Team(" in code
-            assert "members=[researcher_agent, analyst_agent]" in code
-            assert "mode='coordinate'" in code
-            assert "show_members_responses=True" in code
-            assert "enable_agentic_context=True" in code
-
-            # Check for enhanced tools
-            assert "DuckDuckGoTools()" in code
-            assert "YFinanceTools(stock_price=True, analyst_recommendations=True)" in code
-
-    def test_fast_agent_requirements(self):
-        """Test FastAgent requirements generation."""
-        content = """
-FROM yeahdongcn/agentman-base:latest
-FRAMEWORK fast-agent
-MODEL anthropic/claude-3-sonnet-20241022
-AGENT test
-INSTRUCTION Test agent
-"""
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            requirements = builder.framework.get_requirements()
 
-            assert "fast-agent-mcp>=0.2.33" in requirements
-            assert "deprecated>=1.2.18" in requirements
-
-    def test_agno_requirements(self):
-        """Test Agno requirements generation."""
-        content = """
+_AGNO_SERVERS_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK agno
 MODEL anthropic/claude-3-sonnet-20241022
@@ -174,43 +59,16 @@ AGENT test
 INSTRUCTION Test agent
 SERVERS web_search finance
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            requirements = builder.framework.get_requirements()
-
-            assert "agno>=1.6.0" in requirements
-            assert "anthropic" in requirements
-            assert "mcp" in requirements
-            assert "duckduckgo-search" in requirements
-            assert "yfinance" in requirements
-            assert "sqlalchemy" in requirements
-            assert "lancedb" in requirements
-            assert "tantivy" in requirements
-
-    def test_openai_model_requirements(self):
-        """Test that OpenAI models add OpenAI dependency."""
-        content = """
+
+_AGNO_OPENAI_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK agno
 MODEL openai/gpt-4
 AGENT test
 INSTRUCTION Test agent
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            requirements = builder.framework.get_requirements()
-
-            assert "openai" in requirements
 
-    def test_fast_agent_config_generation(self):
-        """Test FastAgent config file generation."""
-        content = """
+_FAST_AGENT_SECRET_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK fast-agent
 MODEL anthropic/claude-3-sonnet-20241022
@@ -218,21 +76,8 @@ AGENT test
 INSTRUCTION Test agent
 SECRET ANTHROPIC_API_KEY
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            builder.framework.generate_config_files()
 
-            # Check that FastAgent config files are created
-            assert (Path(temp_dir) / "fastagent.config.yaml").exists()
-            assert (Path(temp_dir) / "fastagent.secrets.yaml").exists()
-            assert not (Path(temp_dir) / ".env").exists()
-
-    def test_agno_config_generation(self):
-        """Test Agno config file generation."""
-        content = """
+_AGNO_SECRET_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK agno
 MODEL anthropic/claude-3-sonnet-20241022
@@ -240,89 +85,30 @@ AGENT test
 INSTRUCTION Test agent
 SECRET ANTHROPIC_API_KEY
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            builder.framework.generate_config_files()
-
-            # Check that Agno config files are created
-            assert (Path(temp_dir) / ".env").exists()
-            assert not (Path(temp_dir) / "fastagent.config.yaml").exists()
-            assert not (Path(temp_dir) / "fastagent.secrets.yaml").exists()
-
-    def test_dockerfile_framework_specific_copy(self):
-        """Test that Dockerfile copies correct config files for each framework."""
-        # Test FastAgent
-        content = """
+_FAST_AGENT_SECRET_VALUES_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK fast-agent
 MODEL anthropic/claude-3-sonnet-20241022
 AGENT test
 INSTRUCTION Test agent
+SECRET ANTHROPIC_API_KEY sk-123
+SECRET openai
+API_KEY k
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            builder._generate_dockerfile()
-
-            with open(Path(temp_dir) / "Dockerfile", 'r') as f:
-                dockerfile_content = f.read()
-                assert "COPY fastagent.config.yaml ." in dockerfile_content
-                assert "COPY fastagent.secrets.yaml ." in dockerfile_content
-                assert "COPY .env ." not in dockerfile_content
-
-        # Test Agno
-        content = """
-FROM yeahdongcn/agentman-base:latest
-FRAMEWORK agno
-MODEL anthropic/claude-3-sonnet-20241022
-AGENT test
-INSTRUCTION Test agent
-"""
-        config = parser.parse_content(content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            builder = AgentBuilder(config, temp_dir)
-            builder._generate_dockerfile()
 
-            with open(Path(temp_dir) / "Dockerfile", 'r') as f:
-                dockerfile_content = f.read()
-                assert "COPY .env ." in dockerfile_content
-                assert "COPY fastagent.config.yaml ." not in dockerfile_content
-                assert "COPY fastagent.secrets.yaml ." not in dockerfile_content
-
-    def test_build_output_messages(self):
-        """Test that build completion shows correct files for each framework."""
-        # This would need to be tested by capturing print output
-        # For now, we'll just verify the logic exists
-        content_agno = """
+_AGNO_SECRET_VALUES_CONTENT = """
 FROM yeahdongcn/agentman-base:latest
 FRAMEWORK agno
 MODEL anthropic/claude-3-sonnet-20241022
 AGENT test
 INSTRUCTION Test agent
+SECRET ANTHROPIC_API_KEY sk-123
+SECRET openai
+API_KEY k
 """
-        parser = AgentfileParser()
-        config = parser.parse_content(content_agno)
-        assert config.framework == "agno"
 
-        content_fast = """
-FROM yeahdongcn/agentman-base:latest
-FRAMEWORK fast-agent
-MODEL anthropic/claude-3-sonnet-20241022
-AGENT test
-INSTRUCTION Test agent
-"""
-        config = parser.parse_content(content_fast)
-        assert config.framework == "fast-agent"
-
-    def test_agent_specific_model_instruction(self):
-        """Test that MODEL instruction within AGENT context works correctly."""
-        agentfile_content = """FROM yeahdongcn/agentman-base:latest
+_AGENT_MODEL_CONTENT = """FROM yeahdongcn/agentman-base:latest
 FRAMEWORK agno
 MODEL anthropic/claude-3-haiku-20240307
 
@@ -339,8 +125,223 @@ USE_HISTORY true
 HUMAN_INPUT false
 """
 
+
+@functools.lru_cache(maxsize=None)
+def _parse(content):
+    """Parse content once per distinct string; callers must not mutate the result."""
+    return AgentfileParser().parse_content(content)
+
+
+class TestFrameworkSupport:
+    """Test framework detection and code generation."""
+
+    def test_framework_parsing_fast_agent_default(self):
+        """Test that FastAgent is the default framework."""
+        config = _parse(_DEFAULT_FRAMEWORK_CONTENT)
+        assert config.framework == "fast-agent"
+
+    def test_framework_parsing_agno_explicit(self):
+        """Test parsing explicit Agno framework."""
+        config = _parse(_AGNO_CONTENT)
+        assert config.framework == "agno"
+
+    def test_framework_parsing_fast_agent_explicit(self):
+        """Test parsing explicit FastAgent framework."""
+        config = _parse(_FAST_AGENT_CONTENT)
+        assert config.framework == "fast-agent"
+
+    def test_framework_validation_invalid(self):
+        """Test that invalid framework raises error."""
         parser = AgentfileParser()
-        config = parser.parse_content(agentfile_content)
+        with pytest.raises(ValueError, match="Unsupported framework"):
+            parser.parse_content(_INVALID_FRAMEWORK_CONTENT)
+
+    def test_fast_agent_code_generation(self, tmp_path):
+        """Test FastAgent code generation."""
+        config = _parse(_FAST_AGENT_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        code = builder.framework.build_agent_content()
+
+        assert "from mcp_agent.core.fastagent import FastAgent" in code
+        assert 'FastAgent("Generated by Agentman")' in code
+        assert "@fast.agent" in code
+        assert "async with fast.run() as agent:" in code
+
+    def test_agno_code_generation(self, tmp_path):
+        """Test Agno code generation."""
+        config = _parse(_AGNO_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        code = builder.framework.build_agent_content()
+
+        assert "from agno.agent import Agent" in code
+        assert "from agno.models.anthropic import Claude" in code
+        assert "from agno.tools.reasoning import ReasoningTools" in code
+        assert "Agent(" in code
+        assert "Claude(id=" in code
+        assert ".print_response(" in code
+        assert "show_full_reasoning=True" in code
+        assert "stream_intermediate_steps=True" in code
+
+    def test_agno_multi_agent_team_generation(self, tmp_path):
+        """Test Agno multi-agent team generation."""
+        config = _parse(_AGNO_TEAM_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        code = builder.framework.build_agent_content()
+
+        # Check for team imports
+        assert "from agno.team.team import Team" in code
+
+        # Check for multiple agents
+        assert "researcher_agent = Agent(" in code
+        assert "analyst_agent = Agent(" in code
+
+        # Check for team creation
+        assert "agentteam = Team(" in code
+        assert "members=[researcher_agent, analyst_agent]" in code
+        assert "mode='coordinate'" in code
+        assert "show_members_responses=True" in code
+        assert "enable_agentic_context=True" in code
+
+        # Check for enhanced tools
+        assert "DuckDuckGoTools()" in code
+        assert "YFinanceTools(stock_price=True, analyst_recommendations=True)" in code
+
+    def test_fast_agent_requirements(self, tmp_path):
+        """Test FastAgent requirements generation."""
+        config = _parse(_FAST_AGENT_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        requirements = builder.framework.get_requirements()
+
+        assert "fast-agent-mcp>=0.2.33" in requirements
+        assert "deprecated>=1.2.18" in requirements
+
+    def test_agno_requirements(self, tmp_path):
+        """Test Agno requirements generation."""
+        config = _parse(_AGNO_SERVERS_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        requirements = builder.framework.get_requirements()
+
+        assert "agno>=1.6.0" in requirements
+        assert "anthropic" in requirements
+        assert "mcp" in requirements
+        assert "duckduckgo-search" in requirements
+        assert "yfinance" in requirements
+        assert "sqlalchemy" in requirements
+        assert "lancedb" in requirements
+        assert "tantivy" in requirements
+
+    def test_openai_model_requirements(self, tmp_path):
+        """Test that OpenAI models add OpenAI dependency."""
+        config = _parse(_AGNO_OPENAI_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        requirements = builder.framework.get_requirements()
+
+        assert "openai" in requirements
+
+    @pytest.mark.io
+    def test_fast_agent_config_generation(self, tmp_path):
+        """Test FastAgent config file generation."""
+        config = _parse(_FAST_AGENT_SECRET_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        builder.framework.generate_config_files()
+
+        # Check that FastAgent config files are created
+        assert (tmp_path / "fastagent.config.yaml").exists()
+        assert (tmp_path / "fastagent.secrets.yaml").exists()
+        assert not (tmp_path / ".env").exists()
+
+    @pytest.mark.io
+    def test_agno_config_generation(self, tmp_path):
+        """Test Agno config file generation."""
+        config = _parse(_AGNO_SECRET_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        builder.framework.generate_config_files()
+
+        # Check that Agno config files are created
+        assert (tmp_path / ".env").exists()
+        assert not (tmp_path / "fastagent.config.yaml").exists()
+        assert not (tmp_path / "fastagent.secrets.yaml").exists()
+
+    @pytest.mark.io
+    def test_fast_agent_secrets_content(self, tmp_path):
+        """Test that inline secrets and secret contexts are written to fastagent.secrets.yaml."""
+        config = _parse(_FAST_AGENT_SECRET_VALUES_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        builder.framework.generate_config_files()
+
+        with open(tmp_path / "fastagent.secrets.yaml", 'r', encoding='utf-8') as f:
+            secrets_data = yaml.safe_load(f)
+        assert secrets_data == {
+            "anthropic": {"api_key": "sk-123"},
+            "openai": {"api_key": "k"},
+        }
+
+    @pytest.mark.io
+    def test_agno_env_content(self, tmp_path):
+        """Test that inline secrets and secret contexts are written to the Agno .env file."""
+        config = _parse(_AGNO_SECRET_VALUES_CONTENT)
+
+        builder = AgentBuilder(config, tmp_path)
+        builder.framework.generate_config_files()
+
+        env_lines = (tmp_path / ".env").read_text(encoding='utf-8').splitlines()
+        assert "ANTHROPIC_API_KEY=sk-123" in env_lines
+        assert "# OPENAI configuration" in env_lines
+        assert "OPENAI_API_KEY=k" in env_lines
+
+    @pytest.mark.io
+    def test_dockerfile_framework_specific_copy(self, tmp_path):
+        """Test that Dockerfile copies correct config files for each framework."""
+        # Test FastAgent
+        config = _parse(_FAST_AGENT_CONTENT)
+
+        output_dir = tmp_path / "fast-agent"
+        output_dir.mkdir()
+        builder = AgentBuilder(config, output_dir)
+        builder._generate_dockerfile()
+
+        with open(output_dir / "Dockerfile", 'r') as f:
+            dockerfile_content = f.read()
+            assert "COPY fastagent.config.yaml ." in dockerfile_content
+            assert "COPY fastagent.secrets.yaml ." in dockerfile_content
+            assert "COPY .env ." not in dockerfile_content
+
+        # Test Agno
+        config = _parse(_AGNO_CONTENT)
+
+        output_dir = tmp_path / "agno"
+        output_dir.mkdir()
+        builder = AgentBuilder(config, output_dir)
+        builder._generate_dockerfile()
+
+        with open(output_dir / "Dockerfile", 'r') as f:
+            dockerfile_content = f.read()
+            assert "COPY .env ." in dockerfile_content
+            assert "COPY fastagent.config.yaml ." not in dockerfile_content
+            assert "COPY fastagent.secrets.yaml ." not in dockerfile_content
+
+    def test_build_output_messages(self):
+        """Test that build completion shows correct files for each framework."""
+        # This would need to be tested by capturing print output
+        # For now, we'll just verify the logic exists
+        config = _parse(_AGNO_CONTENT)
+        assert config.framework == "agno"
+
+        config = _parse(_FAST_AGENT_CONTENT)
+        assert config.framework == "fast-agent"
+
+    def test_agent_specific_model_instruction(self):
+        """Test that MODEL instruction within AGENT context works correctly."""
+        config = _parse(_AGENT_MODEL_CONTENT)
 
         # Check global model
         assert config.default_model == "anthropic/claude-3-haiku-20240307"